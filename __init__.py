@@ -1,23 +1,107 @@
+from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from .const import DOMAIN, PLATFORMS
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+from .const import (
+    DOMAIN,
+    PLATFORMS,
+    DATA_HUB,
+    STORAGE_VERSION,
+    STORAGE_KEY,
+    HISTORY_STORAGE_KEY,
+)
+from .coordinator import NLAlertCoordinator
+from .hub import NLAlertHub
+from .services import async_setup_services
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Nothing at setup time."""
+    """Register the domain services."""
+    async_setup_services(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up NL-Alert (Burgernet + NL-Alert) from a config entry."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
 
-    # Forward to both sensor and binary_sensor
+    # One domain-wide hub does the upstream fetch for every entry
+    hub = hass.data[DOMAIN].get(DATA_HUB)
+    if hub is None:
+        hub = hass.data[DOMAIN][DATA_HUB] = _create_hub(hass)
+    hub.async_subscribe(entry.entry_id, {**entry.data, **entry.options})
+    await hub.async_start()
+    if hub.data is None:
+        await _async_release_hub(hass, entry)
+        raise ConfigEntryNotReady("No alert data available yet")
+
+    # One coordinator per entry evaluates its locations, shared by all platforms
+    coordinator = NLAlertCoordinator(hass, entry, hub)
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+    entry.async_on_unload(coordinator.async_track_hub())
+    entry.async_on_unload(coordinator.async_track_trackers())
+
+    # Forward to the sensor, binary_sensor and geo_location platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Reload when the tracked locations or radius change in the options flow
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    return True
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Scope entity unique ids by entry, so several entries can coexist."""
+    if entry.version == 1:
+        @callback
+        def _scope(entity_entry):
+            if entity_entry.unique_id.startswith(entry.entry_id):
+                return None
+            return {"new_unique_id": f"{entry.entry_id}_{entity_entry.unique_id}"}
+
+        await er.async_migrate_entries(hass, entry.entry_id, _scope)
+        hass.config_entries.async_update_entry(entry, version=2)
     return True
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the persisted payload cache and history once the last entry is removed."""
+    others = [
+        other for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ]
+    if not others:
+        await Store(hass, STORAGE_VERSION, STORAGE_KEY).async_remove()
+        await Store(hass, STORAGE_VERSION, HISTORY_STORAGE_KEY).async_remove()
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload config entry (all platforms)."""
-    unload_ok = await hass.config_entries.async_forward_entry_unload(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        await _async_release_hub(hass, entry)
     return unload_ok
+
+def _create_hub(hass: HomeAssistant) -> NLAlertHub:
+    """
+    Create the hub outside of the current entry's context. Otherwise
+    DataUpdateCoordinator binds it to that entry and shuts it down when the
+    entry unloads, while other entries still use it. Its lifetime is managed
+    by the subscriber count in `_async_release_hub` instead.
+    """
+    current_entry = getattr(config_entries, "current_entry", None)
+    if current_entry is None:
+        return NLAlertHub(hass)
+    token = current_entry.set(None)
+    try:
+        return NLAlertHub(hass)
+    finally:
+        current_entry.reset(token)
+
+async def _async_release_hub(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Unsubscribe from the hub, shutting it down after the last entry."""
+    hub = hass.data[DOMAIN].get(DATA_HUB)
+    if hub is not None and not hub.async_unsubscribe(entry.entry_id):
+        hass.data[DOMAIN].pop(DATA_HUB)
+        await hub.async_shutdown()
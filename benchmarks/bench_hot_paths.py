@@ -0,0 +1,161 @@
+# custom_components/nl_alert/benchmarks/bench_hot_paths.py
+
+"""
+Micro-benchmarks for the geometry and matching hot paths, on seeded
+synthetic payloads. Runs offline, without Home Assistant:
+
+    python benchmarks/bench_hot_paths.py
+    python benchmarks/bench_hot_paths.py --save before.json
+    python benchmarks/bench_hot_paths.py --compare before.json -k polygon
+
+Reports time per call and the peak memory allocated during one call.
+"""
+
+import argparse
+import json
+import random
+import timeit
+import tracemalloc
+
+from common import burgernet_alerts, load_module, nl_alert_payload, random_point
+
+geometry = load_module("geometry")
+model = load_module("model")
+decode = load_module("decode")
+
+
+def build_cases(args):
+    """Return [(name, callable)] over payloads built from `args`."""
+    rng = random.Random(args.seed)
+    alerts = burgernet_alerts(args.burgernet, seed=args.seed)
+    payload = nl_alert_payload(
+        args.nl_alert, vertices=(args.min_vertices, args.max_vertices), seed=args.seed
+    )
+    data = {"burgernet": alerts, "nl_alert": payload}
+    compiled = model.compile_alerts(data, generation=1)
+    raw_nl_alert = json.dumps(payload).encode()
+
+    point = random_point(rng)
+    points = [random_point(rng) for _ in range(args.trackers)]
+    radius_m = 5000
+
+    # The largest active polygon, in each representation
+    polygon = max(compiled.nl_alert, key=lambda p: len(p.lats))
+    vertices = len(polygon.lats)
+    ring = list(zip(polygon.lats, polygon.lons))
+    poly_str = max(
+        (item["area"][0] for item in payload["data"] if item["stop_at"] is None),
+        key=len,
+    )
+    inside = ((polygon.min_lat + polygon.max_lat) / 2, (polygon.min_lon + polygon.max_lon) / 2)
+    centres = [(c.lat, c.lon) for c in compiled.circles]
+
+    warm = model.ResultCache()
+    warm.evaluate(compiled, points, radius_m)
+
+    return [
+        ("haversine", lambda: geometry.haversine(point[0], point[1], 52.1, 5.1)),
+        (
+            f"batch_haversine[{len(points)}x{len(centres)}]",
+            lambda: geometry.batch_haversine(points, centres),
+        ),
+        (
+            f"point_in_polygon[{vertices}]",
+            lambda: geometry.point_in_polygon(inside[0], inside[1], ring),
+        ),
+        (
+            f"point_in_polygon_arrays[{vertices}]",
+            lambda: geometry.point_in_polygon_arrays(
+                inside[0], inside[1], polygon.lats, polygon.lons
+            ),
+        ),
+        (
+            f"NLAlertPolygon.contains[{vertices}]",
+            lambda: polygon.contains(inside[0], inside[1]),
+        ),
+        (
+            f"batch_point_in_polygon[{len(points)}x{vertices}]",
+            lambda: geometry.batch_point_in_polygon(points, polygon.lats, polygon.lons),
+        ),
+        (f"parse_polygon[{vertices}]", lambda: model.parse_polygon(poly_str)),
+        (f"decode_nl_alert[{len(raw_nl_alert) // 1024} KiB]", lambda: decode.decode_nl_alert(raw_nl_alert)),
+        ("compile_alerts", lambda: model.compile_alerts(data)),
+        # The former per-entity filters are now AlertModel lookups
+        ("match_burgernet", lambda: compiled.match_burgernet(point[0], point[1], radius_m)),
+        ("rank_burgernet", lambda: compiled.rank_burgernet(point[0], point[1], radius_m)),
+        ("match_nl_alert", lambda: compiled.match_nl_alert(point[0], point[1])),
+        ("match_nl_alert[inside]", lambda: compiled.match_nl_alert(inside[0], inside[1])),
+        (
+            f"match_many[{len(points)}]",
+            lambda: compiled.match_many(points, radius_m),
+        ),
+        (
+            f"ResultCache.evaluate[{len(points)}, warm]",
+            lambda: warm.evaluate(compiled, points, radius_m),
+        ),
+        ("safe_radius", lambda: compiled.safe_radius(point[0], point[1], radius_m)),
+    ]
+
+
+def measure(func, min_time):
+    """Return (seconds per call, peak bytes allocated by one call)."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    per_call = min(timer.repeat(repeat=3, number=number)) / number
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return per_call, peak
+
+
+def _format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.1f} ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--burgernet", type=int, default=3000, help="Burgernet alerts")
+    parser.add_argument("--nl-alert", type=int, default=6, help="active NL-Alert items")
+    parser.add_argument("--min-vertices", type=int, default=10000)
+    parser.add_argument("--max-vertices", type=int, default=50000)
+    parser.add_argument("--trackers", type=int, default=50, help="points for batch cases")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per case")
+    parser.add_argument("-k", dest="pattern", help="only cases containing this text")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save")
+    args = parser.parse_args()
+
+    print(f"numpy: {'yes' if geometry.np is not None else 'no'}")
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    results = {}
+    print(f"{'case':<44} {'time/call':>11} {'peak alloc':>12} {'vs base':>8}")
+    for name, func in build_cases(args):
+        if args.pattern and args.pattern not in name:
+            continue
+        per_call, peak = measure(func, args.min_time)
+        results[name] = {"seconds": per_call, "peak_bytes": peak}
+        ratio = ""
+        if name in baseline:
+            ratio = f"{baseline[name]['seconds'] / per_call:7.2f}x"
+        print(f"{name:<44} {_format_time(per_call):>11} {peak / 1024:9.1f} KiB {ratio:>8}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
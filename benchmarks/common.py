@@ -0,0 +1,117 @@
+# custom_components/nl_alert/benchmarks/common.py
+
+"""
+Shared helpers for the offline benchmarks and the load harness: importing
+the integration's pure-Python modules without Home Assistant, and building
+seeded synthetic Burgernet / NL-Alert payloads.
+"""
+
+import importlib
+import math
+import os
+import random
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rough bounding box of the Netherlands
+NL_LAT = (50.75, 53.55)
+NL_LON = (3.35, 7.20)
+
+
+def register_package():
+    """
+    Register the integration directory as the `nl_alert` package without
+    running its `__init__.py`, which needs Home Assistant. Also used by the
+    tests' conftest.
+    """
+    if "nl_alert" not in sys.modules:
+        package = types.ModuleType("nl_alert")
+        package.__path__ = [ROOT]
+        sys.modules["nl_alert"] = package
+
+
+def load_module(name):
+    """Import `<integration>.<name>` through `register_package`."""
+    register_package()
+    return importlib.import_module(f"nl_alert.{name}")
+
+
+def random_point(rng):
+    """A uniformly random (lat, lon) inside `NL_LAT` x `NL_LON`."""
+    return rng.uniform(*NL_LAT), rng.uniform(*NL_LON)
+
+
+def burgernet_alerts(count, seed=0, national_every=500):
+    """`count` Burgernet alerts shaped like the live API response."""
+    rng = random.Random(seed)
+    alerts = []
+    for i in range(count):
+        lat, lon = random_point(rng)
+        level = 10 if national_every and i % national_every == 0 else rng.choice((1, 2, 3))
+        radius = rng.choice((500, 1000, 2500, 5000, 10000, 25000))
+        alerts.append({
+            "AlertId": 100000 + i,
+            "AlertLevel": level,
+            "Message": {
+                "Title": f"Vermist kind {i}",
+                "Description": "Synthetic alert for benchmarking. " * 4,
+                "DescriptionExt": "Vermissing",
+                "Readmore_URL": f"https://example.invalid/alerts/{i}",
+                "Media": {
+                    "Image": f"https://example.invalid/{i}.jpg",
+                    "SmallImage": f"https://example.invalid/{i}_small.jpg",
+                },
+            },
+            "Area": {
+                "Description": f"Gebied {i}",
+                "Circle": f"{lat:.5f},{lon:.5f} {radius}",
+            },
+        })
+    return alerts
+
+
+def polygon_string(rng, vertices, centre=None, radius_deg=0.3):
+    """
+    A closed, non-convex polygon of `vertices` points in the
+    `"lat,lon lat,lon …"` format of the NL-Alert API. The outline is smooth
+    with slight noise, like a traced municipal boundary; per-vertex random
+    radii would give unrealistically long, criss-crossing edges.
+    """
+    lat0, lon0 = centre or random_point(rng)
+    phase1, phase2 = rng.uniform(0, 2 * math.pi), rng.uniform(0, 2 * math.pi)
+    pairs = []
+    for k in range(vertices):
+        angle = 2 * math.pi * k / vertices
+        r = radius_deg * (
+            1
+            + 0.25 * math.sin(3 * angle + phase1)
+            + 0.1 * math.sin(11 * angle + phase2)
+            + 0.002 * rng.random()
+        )
+        lat = lat0 + r * math.sin(angle)
+        lon = lon0 + r * math.cos(angle) / math.cos(math.radians(lat0))
+        pairs.append(f"{lat:.6f},{lon:.6f}")
+    return " ".join(pairs)
+
+
+def nl_alert_payload(count, vertices=(10000, 50000), seed=0, inactive=0.5):
+    """
+    An NL-Alert API payload with `count` active items whose polygons have
+    between `vertices[0]` and `vertices[1]` points, plus a share of ended
+    items (`stop_at` set) as in the live feed.
+    """
+    rng = random.Random(seed)
+    items = []
+    total = count + int(count * inactive)
+    for i in range(total):
+        active = i < count
+        items.append({
+            "id": f"nl-{seed}-{i}",
+            "message": f"NL-Alert {i}\nSynthetic message for benchmarking.",
+            "start_at": "2024-01-01T12:00:00Z",
+            "stop_at": None if active else "2024-01-01T14:00:00Z",
+            "area": [polygon_string(rng, rng.randint(*vertices))],
+        })
+    return {"data": items}
@@ -0,0 +1,224 @@
+# custom_components/nl_alert/benchmarks/fake_upstream.py
+
+"""
+Local stand-in for the Burgernet and NL-Alert APIs. Serves recorded or
+synthetic payloads with ETag validators and can inject latency, 5xx errors
+and very large polygon feeds:
+
+    python benchmarks/fake_upstream.py --latency 0.5 --error-rate 0.1
+
+The feeds are served at /burgernet and /nl_alert.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+
+from aiohttp import web
+
+from common import burgernet_alerts, nl_alert_payload, random_point
+
+SOURCES = ("burgernet", "nl_alert")
+
+
+def _new_stats():
+    return {source: {"requests": 0, "bytes": 0, "status": {}} for source in SOURCES}
+
+
+class FakeUpstream:
+    """
+    aiohttp application serving one payload per source. Requests carrying
+    the current ETag get a 304 (unless `not_modified` is off); with
+    `rotate_every` set, a few alerts change at that interval so clients see
+    real diffs.
+    """
+
+    def __init__(
+        self,
+        burgernet,
+        nl_alert,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        retry_after=None,
+        not_modified=True,
+        rotate_every=0,
+        seed=0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.not_modified = not_modified
+        self.rotate_every = rotate_every
+        self.stats = _new_stats()
+        self._rng = random.Random(seed)
+        self._payloads = {}
+        self._bodies = {}
+        self._runner = None
+        self._rotator = None
+        self.set_payload("burgernet", burgernet)
+        self.set_payload("nl_alert", nl_alert)
+
+        self.app = web.Application()
+        for source in SOURCES:
+            self.app.router.add_get(f"/{source}", self._handler(source))
+
+    def set_payload(self, source, payload):
+        """Serve `payload` for `source` from now on, encoded once."""
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        self._payloads[source] = payload
+        self._bodies[source] = (body, etag)
+
+    def take_stats(self):
+        """Return the request counters since the last call, and reset them."""
+        stats, self.stats = self.stats, _new_stats()
+        return stats
+
+    def _handler(self, source):
+        async def handle(request):
+            stats = self.stats[source]
+            stats["requests"] += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            if delay:
+                await asyncio.sleep(delay)
+
+            body, etag = self._bodies[source]
+            headers = {"ETag": etag}
+            if self._rng.random() < self.error_rate:
+                status = self._rng.choice((500, 502, 503))
+                if status == 503 and self.retry_after is not None:
+                    headers = {"Retry-After": str(self.retry_after)}
+                response = web.Response(status=status, headers=headers)
+            elif self.not_modified and request.headers.get("If-None-Match") == etag:
+                response = web.Response(status=304, headers=headers)
+            else:
+                response = web.Response(
+                    body=body, content_type="application/json", headers=headers
+                )
+                stats["bytes"] += len(body)
+            stats["status"][response.status] = stats["status"].get(response.status, 0) + 1
+            return response
+
+        return handle
+
+    def _rotate(self):
+        """Replace a few Burgernet alerts and toggle one NL-Alert item."""
+        alerts = list(self._payloads["burgernet"])
+        for _ in range(max(1, len(alerts) // 100)):
+            if not alerts:
+                break
+            victim = alerts.pop(self._rng.randrange(len(alerts)))
+            lat, lon = random_point(self._rng)
+            replacement = dict(victim, AlertId=self._rng.randrange(10**9))
+            replacement["Area"] = dict(
+                victim.get("Area") or {}, Circle=f"{lat:.5f},{lon:.5f} 5000"
+            )
+            alerts.append(replacement)
+        self.set_payload("burgernet", alerts)
+
+        payload = self._payloads["nl_alert"]
+        items = [dict(item) for item in payload.get("data", [])]
+        if items:
+            item = self._rng.choice(items)
+            item["stop_at"] = None if item.get("stop_at") else "2024-01-01T14:00:00Z"
+        self.set_payload("nl_alert", {**payload, "data": items})
+
+    async def _rotate_forever(self):
+        while True:
+            await asyncio.sleep(self.rotate_every)
+            self._rotate()
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start serving; returns the base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        if self.rotate_every:
+            self._rotator = asyncio.create_task(self._rotate_forever())
+        bound_port = self._runner.addresses[0][1]
+        return f"http://{host}:{bound_port}"
+
+    async def stop(self):
+        """Stop serving."""
+        if self._rotator is not None:
+            self._rotator.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def add_arguments(parser):
+    """Options shared with the load harness."""
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--burgernet", type=int, default=200, help="synthetic Burgernet alerts")
+    parser.add_argument("--nl-alert", type=int, default=3, help="synthetic active NL-Alert items")
+    parser.add_argument("--min-vertices", type=int, default=1000)
+    parser.add_argument("--max-vertices", type=int, default=5000)
+    parser.add_argument("--burgernet-file", help="recorded Burgernet response (JSON)")
+    parser.add_argument("--nl-alert-file", help="recorded NL-Alert response (JSON)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx responses")
+    parser.add_argument("--retry-after", type=int, help="Retry-After seconds on 503")
+    parser.add_argument("--no-304", action="store_true", help="always send full bodies")
+    parser.add_argument("--rotate-every", type=float, default=0, help="change alerts every N s")
+
+
+def from_arguments(args):
+    """Build a FakeUpstream from parsed `add_arguments` options."""
+    if args.burgernet_file:
+        with open(args.burgernet_file, encoding="utf-8") as fh:
+            burgernet = json.load(fh)
+    else:
+        burgernet = burgernet_alerts(args.burgernet, seed=args.seed)
+    if args.nl_alert_file:
+        with open(args.nl_alert_file, encoding="utf-8") as fh:
+            nl_alert = json.load(fh)
+    else:
+        nl_alert = nl_alert_payload(
+            args.nl_alert, vertices=(args.min_vertices, args.max_vertices), seed=args.seed
+        )
+    return FakeUpstream(
+        burgernet,
+        nl_alert,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        not_modified=not args.no_304,
+        rotate_every=args.rotate_every,
+        seed=args.seed,
+    )
+
+
+async def _serve(args):
+    upstream = from_arguments(args)
+    base = await upstream.start(args.host, args.port)
+    for source in SOURCES:
+        print(f"{source}: {base}/{source}")
+    try:
+        while True:
+            await asyncio.sleep(args.report_every)
+            print(json.dumps(upstream.take_stats()))
+    finally:
+        await upstream.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--report-every", type=float, default=60, help="stats interval (s)")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# custom_components/nl_alert/benchmarks/load_harness.py
+
+"""
+End-to-end load harness: boots a bare Home Assistant core, points the
+integration at a local `FakeUpstream`, and sets up many config entries with
+moving device_trackers. Needs `homeassistant` installed:
+
+    python benchmarks/load_harness.py --entries 20 --trackers 5 --duration 600
+    python benchmarks/load_harness.py --latency 2 --error-rate 0.2 --max-vertices 50000
+
+Every report interval it prints event-loop lag, hub update durations,
+coordinator evaluation durations, memory high-water mark and the upstream
+requests sent in that interval.
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import fake_upstream
+from common import ROOT, random_point
+
+DOMAIN = "nl_alert"
+
+
+class UpstreamThread:
+    """Runs the fake upstream on its own loop so it does not add to our lag."""
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.loop = asyncio.new_event_loop()
+        self.base_url = None
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self.base_url = asyncio.run_coroutine_threadsafe(
+            self.upstream.start(), self.loop
+        ).result()
+        return self.base_url
+
+    def take_stats(self):
+        return asyncio.run_coroutine_threadsafe(
+            self._take_stats(), self.loop
+        ).result()
+
+    async def _take_stats(self):
+        return self.upstream.take_stats()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.upstream.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class Timings:
+    """Durations of calls to a wrapped method, drained per report."""
+
+    def __init__(self):
+        self.samples = []
+
+    def wrap_async(self, cls, name):
+        original = getattr(cls, name)
+        samples = self.samples
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+
+        setattr(cls, name, timed)
+
+    def wrap_sync(self, cls, name):
+        original = getattr(cls, name)
+        samples = self.samples
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+
+        setattr(cls, name, timed)
+
+    def drain(self):
+        samples = self.samples[:]
+        self.samples.clear()
+        return samples
+
+
+async def measure_loop_lag(samples, interval=0.05):
+    """Record how late each `interval` sleep wakes up."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+
+def _summary(samples, scale=1000, unit="ms"):
+    if not samples:
+        return "n/a"
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f"n={len(ordered)} p50={statistics.median(ordered) * scale:.1f}{unit} "
+        f"p99={p99 * scale:.1f}{unit} max={ordered[-1] * scale:.1f}{unit}"
+    )
+
+
+def _memory_high_water():
+    """Peak RSS in MiB (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def start_hass(config_dir, lat, lon):
+    """A minimal running Home Assistant core that can load custom integrations."""
+    from homeassistant import bootstrap, config_entries, core, loader
+
+    hass = core.HomeAssistant(config_dir)
+    hass.config.latitude = lat
+    hass.config.longitude = lon
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    # Translations, entity helpers, registries and the config entries, as
+    # bootstrap sets them up before loading any integration
+    await bootstrap.async_load_base_functionality(hass)
+    await hass.async_start()
+    return hass
+
+
+def make_config_dir():
+    """A throwaway config dir with this checkout as custom_components/nl_alert."""
+    config_dir = tempfile.mkdtemp(prefix="nl_alert_load_")
+    custom = os.path.join(config_dir, "custom_components")
+    os.makedirs(custom)
+    os.symlink(ROOT, os.path.join(custom, DOMAIN))
+    return config_dir
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    upstream = UpstreamThread(fake_upstream.from_arguments(args))
+    base_url = upstream.start()
+
+    config_dir = make_config_dir()
+    sys.path.insert(0, config_dir)
+    home = random_point(rng)
+    hass = await start_hass(config_dir, *home)
+
+    # Point the shared source table at the fake upstream before any setup
+    const = importlib.import_module(f"custom_components.{DOMAIN}.const")
+    hub_module = importlib.import_module(f"custom_components.{DOMAIN}.hub")
+    coordinator_module = importlib.import_module(f"custom_components.{DOMAIN}.coordinator")
+    for source, spec in const.SOURCES.items():
+        spec["url"] = f"{base_url}/{source}"
+
+    updates = Timings()
+    updates.wrap_async(hub_module.NLAlertHub, "_async_update_data")
+    evaluations = Timings()
+    evaluations.wrap_sync(coordinator_module.NLAlertCoordinator, "evaluate")
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    # Device trackers spread over the country, moved every --move-every seconds
+    trackers = []
+    for entry_idx in range(args.entries):
+        for tracker_idx in range(args.trackers):
+            entity_id = f"device_tracker.load_{entry_idx}_{tracker_idx}"
+            lat, lon = random_point(rng)
+            trackers.append([entity_id, lat, lon])
+            hass.states.async_set(
+                entity_id, "not_home",
+                {"latitude": lat, "longitude": lon, "gps_accuracy": 10},
+            )
+
+    intervals = {
+        f"{source}_{bound}_interval": args.interval
+        for source in const.SOURCES
+        for bound in ("min", "max")
+    }
+    setup_start = time.perf_counter()
+    for entry_idx in range(args.entries):
+        entity_ids = [
+            f"device_tracker.load_{entry_idx}_{tracker_idx}"
+            for tracker_idx in range(args.trackers)
+        ]
+        await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": "user"},
+            data={
+                "name": f"Load {entry_idx}",
+                "location_source": "entity",
+                "entity_id": entity_ids,
+                "max_radius": args.max_radius,
+                **intervals,
+            },
+        )
+    await hass.async_block_till_done()
+    print(
+        f"set up {args.entries} entries x {args.trackers} trackers "
+        f"in {time.perf_counter() - setup_start:.2f}s against {base_url}"
+    )
+
+    lag = []
+    lag_task = hass.async_create_background_task(
+        measure_loop_lag(lag), "nl_alert load harness loop lag"
+    )
+    hub = hass.data[DOMAIN][const.DATA_HUB]
+    started = time.monotonic()
+    next_move = next_poll = next_report = started
+    try:
+        while time.monotonic() - started < args.duration:
+            now = time.monotonic()
+            if args.move_every and now >= next_move:
+                next_move = now + args.move_every
+                for tracker in trackers:
+                    tracker[1] += rng.uniform(-0.01, 0.01)
+                    tracker[2] += rng.uniform(-0.01, 0.01)
+                    hass.states.async_set(
+                        tracker[0], "not_home",
+                        {"latitude": tracker[1], "longitude": tracker[2], "gps_accuracy": 10},
+                    )
+            if args.poll_every and now >= next_poll:
+                # Force every source due, as a shorter interval would
+                next_poll = now + args.poll_every
+                for pipeline in hub.pipelines.values():
+                    pipeline.next_due = None
+                await hub.async_request_refresh()
+            if now >= next_report:
+                next_report = now + args.report_every
+                report(upstream, updates, evaluations, lag, args)
+            await asyncio.sleep(0.1)
+        await hass.async_block_till_done()
+        report(upstream, updates, evaluations, lag, args)
+    finally:
+        lag_task.cancel()
+        await hass.async_stop()
+        upstream.stop()
+
+
+def report(upstream, updates, evaluations, lag, args):
+    """Print and reset the metrics gathered since the previous report."""
+    stats = upstream.take_stats()
+    requests = ", ".join(
+        f"{source}={counts['requests']} {counts['status']} {counts['bytes'] // 1024}KiB"
+        for source, counts in stats.items()
+    )
+    memory = f"rss_peak={_memory_high_water():.0f}MiB"
+    if args.tracemalloc:
+        current, peak = tracemalloc.get_traced_memory()
+        memory += f" py_current={current / 2**20:.0f}MiB py_peak={peak / 2**20:.0f}MiB"
+    lag_samples = lag[:]
+    lag.clear()
+    print(f"[{time.strftime('%H:%M:%S')}]")
+    print(f"  loop lag    {_summary(lag_samples)}")
+    print(f"  hub update  {_summary(updates.drain())}")
+    print(f"  evaluate    {_summary(evaluations.drain())}")
+    print(f"  memory      {memory}")
+    print(f"  requests    {requests}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    fake_upstream.add_arguments(parser)
+    parser.add_argument("--entries", type=int, default=10, help="config entries")
+    parser.add_argument("--trackers", type=int, default=3, help="device_trackers per entry")
+    parser.add_argument("--max-radius", type=float, default=5, help="km")
+    parser.add_argument("--interval", type=int, default=1, help="poll interval (min)")
+    parser.add_argument("--poll-every", type=float, default=10, help="force a fetch every N s (0: off)")
+    parser.add_argument("--move-every", type=float, default=5, help="move trackers every N s (0: off)")
+    parser.add_argument("--duration", type=float, default=120, help="seconds")
+    parser.add_argument("--report-every", type=float, default=30, help="seconds")
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace Python allocations")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
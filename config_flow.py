@@ -6,8 +6,19 @@ from homeassistant.helpers.selector import (
     SelectSelector, SelectSelectorConfig,
     EntitySelector, EntitySelectorConfig,
     NumberSelector, NumberSelectorConfig,
+    BooleanSelector,
+)
+from .const import (
+    DOMAIN,
+    SOURCES,
+    DEFAULT_DEBOUNCE,
+    DEFAULT_GEO_RADIUS,
+    DEFAULT_HISTORY_SIZE,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_INLINE_LIMIT,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_MAX_INTERVAL,
 )
-from .const import DOMAIN
 
 # Schema for both the initial setup and options
 STEP_USER_DATA_SCHEMA = vol.Schema({
@@ -27,7 +38,7 @@ STEP_USER_DATA_SCHEMA = vol.Schema({
     vol.Optional(
         CONF_ENTITY_ID
     ): EntitySelector(
-        config=EntitySelectorConfig(domain="device_tracker")
+        config=EntitySelectorConfig(domain="device_tracker", multiple=True)
     ),
     vol.Optional(
         "max_radius",
@@ -44,9 +55,146 @@ STEP_USER_DATA_SCHEMA = vol.Schema({
 })
 
 
+def _entity_list(value):
+    """Older entries store a single entity_id string instead of a list."""
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _interval_fields(current):
+    """Min/max poll interval fields for each upstream source."""
+    fields = {}
+    for source in SOURCES:
+        for bound, default, maximum in (
+            ("min", DEFAULT_MIN_INTERVAL, 60),
+            ("max", DEFAULT_MAX_INTERVAL, 240),
+        ):
+            key = f"{source}_{bound}_interval"
+            fields[vol.Optional(key, default=current.get(key, default))] = NumberSelector(
+                config=NumberSelectorConfig(
+                    min=1,
+                    max=maximum,
+                    step=1,
+                    mode="box",
+                    unit_of_measurement="min",
+                )
+            )
+    return fields
+
+
+def _options_schema(current):
+    """The options form, prefilled with the `current` values."""
+    return vol.Schema({
+        vol.Required(
+            "location_source",
+            default=current.get("location_source", "home")
+        ): SelectSelector(
+            config=SelectSelectorConfig(
+                mode="dropdown",
+                options=[
+                    {"value": "home",   "label": "Use Home location"},
+                    {"value": "entity", "label": "Use a device_tracker entity"},
+                ]
+            )
+        ),
+        vol.Optional(
+            CONF_ENTITY_ID,
+            default=_entity_list(current.get(CONF_ENTITY_ID))
+        ): EntitySelector(
+            config=EntitySelectorConfig(domain="device_tracker", multiple=True)
+        ),
+        vol.Optional(
+            "max_radius",
+            default=current.get("max_radius", 5)
+        ): NumberSelector(
+            config=NumberSelectorConfig(
+                min=0,
+                max=100,
+                step=1,
+                mode="box",
+                unit_of_measurement="km",
+            )
+        ),
+        vol.Optional(
+            "debounce",
+            default=current.get("debounce", DEFAULT_DEBOUNCE)
+        ): NumberSelector(
+            config=NumberSelectorConfig(
+                min=0,
+                max=300,
+                step=1,
+                mode="box",
+                unit_of_measurement="s",
+            )
+        ),
+        **_interval_fields(current),
+        vol.Optional(
+            "inline_limit",
+            default=current.get("inline_limit", DEFAULT_INLINE_LIMIT)
+        ): NumberSelector(
+            config=NumberSelectorConfig(
+                min=0,
+                max=10240,
+                step=1,
+                mode="box",
+                unit_of_measurement="KiB",
+            )
+        ),
+        vol.Optional(
+            "geo_radius",
+            default=current.get("geo_radius", DEFAULT_GEO_RADIUS)
+        ): NumberSelector(
+            config=NumberSelectorConfig(
+                min=0,
+                max=500,
+                step=1,
+                mode="box",
+                unit_of_measurement="km",
+            )
+        ),
+        vol.Optional(
+            "compact_attributes",
+            default=current.get("compact_attributes", False)
+        ): BooleanSelector(),
+        vol.Optional(
+            "history_size",
+            default=current.get("history_size", DEFAULT_HISTORY_SIZE)
+        ): NumberSelector(
+            config=NumberSelectorConfig(
+                min=0,
+                max=100000,
+                step=1,
+                mode="box",
+                unit_of_measurement="alerts",
+            )
+        ),
+        vol.Optional(
+            "history_days",
+            default=current.get("history_days", DEFAULT_HISTORY_DAYS)
+        ): NumberSelector(
+            config=NumberSelectorConfig(
+                min=1,
+                max=3650,
+                step=1,
+                mode="box",
+                unit_of_measurement="d",
+            )
+        ),
+        vol.Optional(
+            "diagnostic_sensors",
+            default=current.get("diagnostic_sensors", False)
+        ): BooleanSelector(),
+        vol.Optional(
+            "log_slow_cycles",
+            default=current.get("log_slow_cycles", False)
+        ): BooleanSelector(),
+    })
+
+
 class NLAlertConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle the configuration flow for NL-Alert & Burgernet integration."""
-    VERSION = 1
+    VERSION = 2
 
     async def async_step_user(self, user_input=None):
         """Show the initial form to set up the integration."""
@@ -95,42 +243,9 @@ class NLAlertOptionsFlowHandler(config_entries.OptionsFlow):
         current = self.config_entry.options or self.config_entry.data
 
         if user_input is None:
-            # Build the same schema but prefill with current values
-            schema = vol.Schema({
-                vol.Required(
-                    "location_source",
-                    default=current.get("location_source", "home")
-                ): SelectSelector(
-                    config=SelectSelectorConfig(
-                        mode="dropdown",
-                        options=[
-                            {"value": "home",   "label": "Use Home location"},
-                            {"value": "entity", "label": "Use a device_tracker entity"},
-                        ]
-                    )
-                ),
-                vol.Optional(
-                    CONF_ENTITY_ID,
-                    default=current.get(CONF_ENTITY_ID)
-                ): EntitySelector(
-                    config=EntitySelectorConfig(domain="device_tracker")
-                ),
-                vol.Optional(
-                    "max_radius",
-                    default=current.get("max_radius", 5)
-                ): NumberSelector(
-                    config=NumberSelectorConfig(
-                        min=0,
-                        max=100,
-                        step=1,
-                        mode="box",
-                        unit_of_measurement="km",
-                    )
-                ),
-            })
             return self.async_show_form(
                 step_id="init",
-                data_schema=schema,
+                data_schema=_options_schema(current),
             )
 
         # Validate again: if entity-based, entity_id must be set
@@ -138,9 +253,10 @@ class NLAlertOptionsFlowHandler(config_entries.OptionsFlow):
             user_input["location_source"] == "entity"
             and not user_input.get(CONF_ENTITY_ID)
         ):
+            # Keep what was entered; the setup schema lacks the options fields
             return self.async_show_form(
                 step_id="init",
-                data_schema=STEP_USER_DATA_SCHEMA,
+                data_schema=_options_schema({**current, **user_input}),
                 errors={CONF_ENTITY_ID: "required"},
             )
 
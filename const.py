@@ -1,10 +1,57 @@
 DOMAIN = "nl_alert"
-PLATFORMS = ["sensor", "binary_sensor"]
+PLATFORMS = ["sensor", "binary_sensor", "geo_location"]
+
+# hass.data[DOMAIN] key of the shared fetch hub (other keys are entry_ids)
+DATA_HUB = "hub"
 
 # Burgernet API (location-filtered alerts)
 BURGERNET_API = "https://services.burgernet.nl/landactiehost/api/v1/alerts"
 # NL-Alert API (national alerts; no location data)
 NL_ALERT_API = "https://api.public-warning.app/api/v1/providers/nl-alert/alerts"
 
+# Per-source fetch settings: endpoint and request timeout (seconds)
+SOURCES = {
+    "burgernet": {"url": BURGERNET_API, "timeout": 10},
+    "nl_alert": {"url": NL_ALERT_API, "timeout": 20},
+}
+
 # (reuse the same poster URL for Burgernet/AMBER)
 STATIC_POSTER_URL = "https://www.burgernet.nl/static/posters/landelijk/1920x1080.jpg"
+
+# Adaptive polling bounds in minutes, per source as "<source>_min_interval" /
+# "<source>_max_interval"; the maximum is the original fixed cadence
+DEFAULT_MIN_INTERVAL = 2
+DEFAULT_MAX_INTERVAL = 10
+
+# Minimum seconds between upstream hits of one source via `nl_alert.refresh`
+REFRESH_MIN_INTERVAL = 30
+
+# Coalescing window (seconds) for re-evaluating after tracker movement
+DEFAULT_DEBOUNCE = 5
+
+# geo_location entities are created for alerts within this distance (km) of home
+DEFAULT_GEO_RADIUS = 50
+
+# Response bodies smaller than this (KiB) are decoded on the event loop;
+# larger ones are decoded and compiled in the executor
+DEFAULT_INLINE_LIMIT = 64
+
+# Persistent cache of the last good payloads, used for instant startup
+STORAGE_VERSION = 1
+STORAGE_KEY = DOMAIN
+# Cached payloads older than this (hours) are not restored
+CACHE_MAX_AGE = 6
+
+# With "log_slow_cycles" enabled, refresh cycles and evaluations taking at
+# least this long (ms) are logged with their timing breakdown
+SLOW_CYCLE_MS = 1000
+
+# Rolling history of seen alerts: entry cap and age (days) of ended alerts
+HISTORY_STORAGE_KEY = f"{DOMAIN}_history"
+DEFAULT_HISTORY_SIZE = 1000
+DEFAULT_HISTORY_DAYS = 30
+
+# Events fired for alert changes that match a tracked location
+EVENT_ALERT_NEW = "nl_alert_new"
+EVENT_ALERT_UPDATED = "nl_alert_updated"
+EVENT_ALERT_ENDED = "nl_alert_ended"
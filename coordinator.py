@@ -0,0 +1,254 @@
+# custom_components/nl_alert/coordinator.py
+
+import logging
+import time
+
+from homeassistant.const import CONF_ENTITY_ID
+from homeassistant.core import callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    DOMAIN,
+    DEFAULT_DEBOUNCE,
+    EVENT_ALERT_NEW,
+    EVENT_ALERT_UPDATED,
+    EVENT_ALERT_ENDED,
+    SLOW_CYCLE_MS,
+)
+from .model import SafeZone
+from .stats import elapsed_ms
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def tracker_ids(config):
+    """
+    Return the device_trackers to evaluate for an entry, or [None] for the
+    home location. Older entries store a single entity_id string.
+    """
+    if config.get("location_source") != "entity":
+        return [None]
+    entity_ids = config.get(CONF_ENTITY_ID) or []
+    if isinstance(entity_ids, str):
+        entity_ids = [entity_ids]
+    return list(entity_ids) or [None]
+
+
+class NLAlertCoordinator(DataUpdateCoordinator):
+    """
+    Per config entry view on the shared hub: evaluates this entry's
+    locations against the hub's alert model, shared by sensor and
+    binary_sensor. It never polls upstream itself.
+    """
+
+    def __init__(self, hass, entry, hub):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} {entry.title}",
+            update_interval=None,
+        )
+        self.entry = entry
+        self.hub = hub
+        config = {**entry.data, **entry.options}
+        self.trackers = tracker_ids(config)
+        self.max_radius_m = config.get("max_radius", 5) * 1000
+        self._debounce = config.get("debounce", DEFAULT_DEBOUNCE)
+        # Keep large alert fields out of state attributes (and the recorder)
+        self.compact_attributes = config.get("compact_attributes", False)
+        # Last verdict per tracker and the radius around it where it holds
+        self._safe_zones = {}
+        # Model generation of the last hub snapshot we saw
+        self._generation = None
+        # Evaluation timings and safe-zone reuse, for diagnostics
+        self.evaluate_ms = None
+        self.evaluations = 0
+        self.safe_zone_hits = 0
+
+    @callback
+    def async_track_hub(self):
+        """Re-evaluate whenever the hub publishes a snapshot. Returns unsub."""
+        if self.hub.data is not None:
+            self._handle_hub_update()
+        return self.hub.async_add_listener(self._handle_hub_update)
+
+    @callback
+    def _handle_hub_update(self):
+        data = self.hub.data
+        if data is None:
+            return
+        generation = data["model"].generation
+        # The first snapshot an entry sees is its baseline, not a change
+        if self._generation is not None and generation != self._generation:
+            self._fire_alert_events(data.get("changes", {}))
+        self._generation = generation
+        self.async_set_updated_data(self._snapshot(data))
+
+    @callback
+    def _fire_alert_events(self, changes):
+        """Fire new/updated/ended events for changed alerts matching our locations."""
+        if not changes:
+            return
+        positions = {tracker: self.location_of(tracker) for tracker in self.trackers}
+        for source, feed in changes.items():
+            for event_type, keys, entries in (
+                (EVENT_ALERT_NEW, feed.added, feed.entries),
+                (EVENT_ALERT_UPDATED, feed.changed, feed.entries),
+                (EVENT_ALERT_ENDED, list(feed.removed), feed.removed),
+            ):
+                for key in keys:
+                    item, compiled = entries[key]
+                    for tracker, (lat, lon) in positions.items():
+                        if not any(c.matches(lat, lon, self.max_radius_m) for c in compiled):
+                            continue
+                        self.hass.bus.async_fire(event_type, {
+                            "entry_id": self.entry.entry_id,
+                            "source": source,
+                            "alert_id": key,
+                            "tracker": tracker,
+                            # Polygon strings can be huge; keep them off the bus
+                            "alert": {k: v for k, v in item.items() if k != "area"},
+                        })
+
+    def _snapshot(self, hub_data):
+        """This entry's view: the hub snapshot plus per-location results."""
+        return {**hub_data, "results": self.evaluate(hub_data["model"])}
+
+    async def _async_update_data(self):
+        """Manual refresh (e.g. homeassistant.update_entity) goes to the hub."""
+        await self.hub.async_request_refresh()
+        return self._snapshot(self.hub.data)
+
+    @callback
+    def async_track_trackers(self):
+        """
+        Re-evaluate on device_tracker movement, coalesced over the debounce
+        window. Returns a callable that stops tracking.
+        """
+        entity_ids = [tracker for tracker in self.trackers if tracker]
+        if not entity_ids:
+            return lambda: None
+
+        debouncer = Debouncer(
+            self.hass,
+            _LOGGER,
+            cooldown=self._debounce,
+            immediate=False,
+            function=self.async_reevaluate,
+        )
+
+        @callback
+        def _tracker_moved(event):
+            self.hass.async_create_task(debouncer.async_call())
+
+        unsub = async_track_state_change_event(self.hass, entity_ids, _tracker_moved)
+
+        @callback
+        def _stop():
+            unsub()
+            debouncer.async_cancel()
+
+        return _stop
+
+    async def async_reevaluate(self):
+        """Re-run evaluation against the cached model, without refetching."""
+        if not self.data or "model" not in self.data:
+            return
+        results = self.evaluate(self.data["model"])
+        if results == self.data.get("results"):
+            return
+        self.data = {**self.data, "results": results}
+        self.async_update_listeners()
+
+    def location_of(self, tracker_entity_id):
+        """Return (lat, lon) of a tracker, or of home if it is None/unavailable."""
+        return self.position_of(tracker_entity_id)[:2]
+
+    def position_of(self, tracker_entity_id):
+        """Return (lat, lon, gps_accuracy) of a tracker, or of home (accuracy 0)."""
+        if tracker_entity_id:
+            state = self.hass.states.get(tracker_entity_id)
+            if state and state.attributes.get("latitude") is not None:
+                return (
+                    state.attributes["latitude"],
+                    state.attributes["longitude"],
+                    state.attributes.get("gps_accuracy") or 0,
+                )
+            _LOGGER.warning(
+                "Tracker %s unavailable or has no coords; using home location",
+                tracker_entity_id,
+            )
+        return self.hass.config.latitude, self.hass.config.longitude, 0
+
+    def evaluate(self, model):
+        """
+        Evaluate all tracked locations against `model` in a single pass.
+        Trackers still inside the safe radius of their last verdict reuse it
+        without any geometry; cached verdicts are reused for the others.
+        """
+        start = time.perf_counter()
+        results = {}
+        pending = []
+        for tracker in self.trackers:
+            lat, lon, accuracy = self.position_of(tracker)
+            zone = self._safe_zones.get(tracker)
+            # With several circles matching, their distance ranking can
+            # change inside the safe radius, so only single matches reuse it
+            if (
+                zone
+                and len(zone.result[0]) < 2
+                and zone.covers(model.generation, lat, lon, accuracy)
+            ):
+                results[tracker] = zone.result
+            else:
+                pending.append((tracker, lat, lon))
+
+        if pending:
+            points = [(lat, lon) for _, lat, lon in pending]
+            matches = self.hub.results.evaluate(model, points, self.max_radius_m)
+            matched = False
+            for (tracker, lat, lon), match in zip(pending, matches):
+                results[tracker] = match
+                burgernet_alerts, nl_item = match
+                for alert in burgernet_alerts:
+                    matched |= self.hub.history.mark_matched("burgernet", alert.get("AlertId"))
+                if nl_item is not None:
+                    matched |= self.hub.history.mark_matched("nl_alert", nl_item.get("id"))
+                self._safe_zones[tracker] = SafeZone(
+                    model.generation,
+                    lat,
+                    lon,
+                    model.safe_radius(lat, lon, self.max_radius_m),
+                    match,
+                )
+            if matched:
+                self.hub.async_save_history()
+
+        self.evaluations += len(self.trackers)
+        self.safe_zone_hits += len(self.trackers) - len(pending)
+        self.evaluate_ms = elapsed_ms(start)
+        if self.hub.log_slow_cycles and self.evaluate_ms >= SLOW_CYCLE_MS:
+            _LOGGER.warning(
+                "Slow evaluation for %s: %s ms for %d locations (%d reused)",
+                self.entry.title,
+                self.evaluate_ms,
+                len(self.trackers),
+                len(self.trackers) - len(pending),
+            )
+        return {tracker: results[tracker] for tracker in self.trackers}
+
+    def diagnostics(self):
+        """Evaluation timings and safe-zone reuse of this entry."""
+        return {
+            "locations": len(self.trackers),
+            "max_radius_m": self.max_radius_m,
+            "evaluate_ms": self.evaluate_ms,
+            "evaluate_ms_per_location": (
+                round(self.evaluate_ms / len(self.trackers), 3)
+                if self.evaluate_ms is not None else None
+            ),
+            "evaluations": self.evaluations,
+            "safe_zone_hits": self.safe_zone_hits,
+        }
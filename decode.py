@@ -0,0 +1,201 @@
+# custom_components/nl_alert/decode.py
+
+import codecs
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # orjson ships with HA core; plain json works too
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Characters that change nesting or start a string
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+# A member's colon and the first character of its value, or `null`
+_MEMBER_VALUE = re.compile(r'\s*:\s*(null|.)', re.S)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ItemStream:
+    """
+    Incrementally extract the objects of a top-level `"data": [...]` array
+    from JSON bytes fed in chunks, keeping only those accepted by `keep`.
+
+    Only one array element is buffered at a time, so memory scales with the
+    kept items. Elements that have a non-null `drop_if_set` member are
+    dropped from their raw text without being decoded; the others are
+    decoded and passed to `keep`.
+    """
+
+    def __init__(self, keep, key="data", drop_if_set=None):
+        self.keep = keep
+        self.key = key
+        self.drop_if_set = drop_if_set
+        self.items = []
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_array = False
+        self._found_array = False
+        self._item_start = None
+        # Position right after the current item's `drop_if_set` key
+        self._drop_key_end = None
+        self._last_string = None
+        # Set while a string is split across chunks: (start, resume search at)
+        self._open_string = None
+
+    def feed(self, chunk):
+        """Consume the next chunk of bytes."""
+        self._buf += self._decoder.decode(chunk)
+        self._scan()
+        # Drop text we no longer need (everything before the current item)
+        cut = self._item_start if self._item_start is not None else self._pos
+        if self._open_string is not None and self._item_start is None:
+            cut = min(cut, self._open_string[0])
+        if cut:
+            self._buf = self._buf[cut:]
+            self._pos -= cut
+            if self._item_start is not None:
+                self._item_start -= cut
+            if self._drop_key_end is not None:
+                self._drop_key_end -= cut
+            if self._open_string is not None:
+                start, resume = self._open_string
+                self._open_string = (start - cut, resume - cut)
+
+    def close(self):
+        """
+        Finish the stream. Raises ValueError unless the document was
+        complete and had the top-level `key` array, so truncated bodies and
+        error pages are not mistaken for an empty feed.
+        """
+        self._decoder.decode(b"", final=True)
+        if not self._started or self._depth != 0 or self._open_string is not None:
+            raise ValueError("Truncated or empty JSON document")
+        if not self._found_array:
+            raise ValueError(f'No top-level "{self.key}" array in JSON document')
+
+    def _scan(self):
+        buf = self._buf
+        while True:
+            if self._open_string is not None:
+                start, resume = self._open_string
+                end = self._string_end(buf, resume)
+                if end < 0:
+                    self._open_string = (start, len(buf))
+                    return
+                self._open_string = None
+                self._close_string(buf, start, end)
+                continue
+
+            match = _STRUCTURAL.search(buf, self._pos)
+            if match is None:
+                self._pos = len(buf)
+                return
+            i = match.start()
+            char = buf[i]
+
+            if char == '"':
+                self._open_string = (i, i + 1)
+                self._pos = i + 1
+                continue
+
+            self._pos = i + 1
+            if char in "{[":
+                if (
+                    char == "["
+                    and self._depth == 1
+                    and self._last_string == self.key
+                ):
+                    self._in_array = True
+                    self._found_array = True
+                elif self._in_array and self._depth == 2 and char == "{":
+                    self._item_start = i
+                self._depth += 1
+                self._started = True
+            else:
+                self._depth -= 1
+                if self._depth < 0:
+                    raise ValueError(f"Unbalanced {char!r} in JSON document")
+                if self._in_array and self._depth == 2 and self._item_start is not None:
+                    start, self._item_start = self._item_start, None
+                    if self._drop_key_end is not None:
+                        drop = self._value_is_set(buf, self._drop_key_end)
+                        self._drop_key_end = None
+                        if drop:
+                            continue
+                    item = _loads(buf[start:i + 1])
+                    if self.keep(item):
+                        self.items.append(item)
+                elif self._in_array and self._depth == 1:
+                    self._in_array = False
+
+    @staticmethod
+    def _string_end(buf, start):
+        """Index of the closing quote at or after `start`, or -1 if not yet read."""
+        while True:
+            end = buf.find('"', start)
+            if end < 0:
+                return -1
+            backslashes = 0
+            k = end - 1
+            while buf[k] == "\\":
+                backslashes += 1
+                k -= 1
+            if backslashes % 2 == 0:
+                return end
+            start = end + 1
+
+    @staticmethod
+    def _value_is_set(buf, pos):
+        """
+        True if the string ending before `pos` is a key whose value is not
+        null. The whole item is buffered, so the value is always there.
+        """
+        match = _MEMBER_VALUE.match(buf, pos)
+        return match is not None and match.group(1) != "null"
+
+    def _close_string(self, buf, start, end):
+        self._pos = end + 1
+        # Strings directly inside the top-level object are keys or values;
+        # the one right before a "[" is always that array's key
+        if self._depth == 1:
+            self._last_string = buf[start + 1:end]
+        elif (
+            self._depth == 3
+            and self._item_start is not None
+            and self.drop_if_set is not None
+            and buf[start + 1:end] == self.drop_if_set
+        ):
+            # A key or a value; `_value_is_set` tells them apart. The last
+            # occurrence wins, as with duplicate keys in a full decode.
+            self._drop_key_end = end + 1
+
+
+def _nl_alert_active(item):
+    """Only currently active NL-Alert items (stop_at == None) are kept."""
+    return isinstance(item, dict) and item.get("stop_at") is None
+
+
+def decode_json(raw):
+    """Decode a whole JSON body."""
+    return _loads(raw)
+
+
+def decode_nl_alert(raw):
+    """
+    Decode the NL-Alert feed, dropping expired items (and their large `area`
+    strings) from the raw text as they are read, without decoding them. Returns `{"data": [active items]}`. Raises
+    ValueError for truncated bodies or documents without a `data` array.
+    """
+    stream = ItemStream(_nl_alert_active, drop_if_set="stop_at")
+    view = memoryview(raw)
+    for start in range(0, len(raw), CHUNK_SIZE):
+        stream.feed(view[start:start + CHUNK_SIZE])
+    stream.close()
+    return {"data": stream.items}
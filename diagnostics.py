@@ -0,0 +1,13 @@
+# custom_components/nl_alert/diagnostics.py
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    """Timings, counters and cache statistics of an entry and the shared hub."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "config": {**entry.data, **entry.options},
+        "entry": coordinator.diagnostics(),
+        "hub": coordinator.hub.diagnostics(),
+    }
@@ -0,0 +1,94 @@
+# custom_components/nl_alert/entity.py
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import STATIC_POSTER_URL
+
+
+def alert_attributes(burgernet_alerts, nl_item, compact=False):
+    """
+    Attributes describing the matched alerts. `burgernet_alerts` is the
+    ranked tuple from the model; the first (nearest) one is detailed. In
+    compact mode only ids and short fields are kept; the full details stay
+    available through the `nl_alert.get_alert_details` service.
+    """
+    attrs = {"sources": []}
+    if not compact:
+        attrs["poster_url"] = STATIC_POSTER_URL
+
+    # Check Burgernet
+    if burgernet_alerts:
+        burgernet_match = burgernet_alerts[0]
+        attrs["sources"].append("burgernet")
+        attrs["burgernet_count"] = len(burgernet_alerts)
+        attrs["burgernet_alert_ids"] = [
+            alert["AlertId"] for alert in burgernet_alerts
+        ]
+        msg = burgernet_match["Message"]
+        area = burgernet_match.get("Area", {})
+        if compact:
+            attrs["burgernet_alert"] = {
+                "alert_id": burgernet_match["AlertId"],
+                "level": burgernet_match["AlertLevel"],
+                "title": msg["Title"],
+            }
+        else:
+            attrs["burgernet_alert"] = {
+                "alert_id": burgernet_match["AlertId"],
+                "level": burgernet_match["AlertLevel"],
+                "title": msg["Title"],
+                "description": msg["Description"],
+                "type": msg["DescriptionExt"],
+                "readmore_url": msg.get("Readmore_URL"),
+                "image": msg["Media"]["Image"],
+                "small_image": msg["Media"]["SmallImage"],
+                "area_description": area.get("Description"),
+                "area_circle": area.get("Circle"),
+            }
+
+    # Check NL-Alert
+    if nl_item:
+        attrs["sources"].append("nl_alert")
+        attrs["nl_alert_id"] = nl_item.get("id")
+        if not compact:
+            attrs["nl_alert_message"] = nl_item.get("message")
+
+    if not attrs["sources"]:
+        attrs["sources"] = ["none"]
+
+    return attrs
+
+
+class NLAlertEntity(CoordinatorEntity):
+    """Base for the per-location NL-Alert entities of one config entry."""
+
+    def __init__(self, coordinator, tracker_entity_id):
+        super().__init__(coordinator)
+        self.tracker_entity_id = tracker_entity_id
+
+        entry_id = coordinator.entry.entry_id
+        if len(coordinator.trackers) == 1:
+            # Single location keeps the original names: sensor.nl_alert, etc.
+            self._attr_name = "NL-Alert"
+            self._attr_unique_id = f"{entry_id}_nl_alert"
+        else:
+            object_id = tracker_entity_id.split(".", 1)[1]
+            self._attr_name = f"NL-Alert {object_id}"
+            self._attr_unique_id = f"{entry_id}_nl_alert_{object_id}"
+
+        self._last_written = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state when the verdict or a matched alert changed."""
+        written = (self.available, self._matches())
+        if written == self._last_written:
+            return
+        self._last_written = written
+        super()._handle_coordinator_update()
+
+    def _matches(self):
+        """Return (ranked burgernet_alerts, nl_alert_item) for our location."""
+        results = (self.coordinator.data or {}).get("results", {})
+        return results.get(self.tracker_entity_id, ((), None))
@@ -0,0 +1,153 @@
+# custom_components/nl_alert/geo_location.py
+
+import logging
+
+from homeassistant.components.geo_location import GeolocationEvent
+from homeassistant.const import UnitOfLength
+from homeassistant.core import callback
+
+from .const import DOMAIN, DEFAULT_GEO_RADIUS
+from .geometry import haversine
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up one geo_location entity per active alert near the entry's locations."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    manager = NLAlertGeoManager(hass, coordinator, async_add_entities)
+    manager.async_update()
+    entry.async_on_unload(coordinator.async_add_listener(manager.async_update))
+
+
+def alert_positions(model):
+    """
+    Yield (source, alert_id, item, lat, lon) for every alert in `model` with
+    a location: the circle centre of a Burgernet alert, or the area-weighted
+    centroid of the polygons of an NL-Alert item.
+    """
+    for compiled in model.burgernet:
+        if compiled.radius_m is None or compiled.alert_id is None:
+            continue
+        yield "burgernet", compiled.alert_id, compiled.alert, compiled.lat, compiled.lon
+
+    # An NL-Alert item may span several polygons; combine their centroids
+    polygons = {}
+    for polygon in model.nl_alert:
+        alert_id = polygon.item.get("id")
+        if alert_id is not None:
+            polygons.setdefault(alert_id, []).append(polygon)
+    for alert_id, parts in polygons.items():
+        centroids = [polygon.centroid() for polygon in parts]
+        total = sum(area for _, _, area in centroids)
+        if total > 0:
+            lat = sum(c_lat * area for c_lat, _, area in centroids) / total
+            lon = sum(c_lon * area for _, c_lon, area in centroids) / total
+        else:
+            lat = sum(c_lat for c_lat, _, _ in centroids) / len(centroids)
+            lon = sum(c_lon for _, c_lon, _ in centroids) / len(centroids)
+        yield "nl_alert", alert_id, parts[0].item, lat, lon
+
+
+class NLAlertGeoManager:
+    """
+    Keeps one geo_location entity per (source, alert_id) within the
+    configured radius of any of the entry's tracked locations, with the
+    distance to the nearest one. Entities are added, updated and removed
+    individually on each new hub snapshot or when a location moves;
+    unchanged alerts are not written.
+    """
+
+    def __init__(self, hass, coordinator, async_add_entities):
+        self.hass = hass
+        self.coordinator = coordinator
+        self._async_add_entities = async_add_entities
+        config = {**coordinator.entry.data, **coordinator.entry.options}
+        self.radius_km = float(config.get("geo_radius", DEFAULT_GEO_RADIUS))
+        self.entities = {}
+        self._generation = None
+        self._locations = None
+
+    @callback
+    def async_update(self):
+        """Diff the alerts near the tracked locations against the current entities."""
+        data = self.coordinator.data
+        if not data:
+            return
+        model = data["model"]
+        positions = [
+            self.coordinator.location_of(tracker) for tracker in self.coordinator.trackers
+        ]
+        # Only a new hub generation or a move of ~100 m or more changes the
+        # entities; GPS jitter and repeated polls do not
+        locations = tuple((round(lat, 3), round(lon, 3)) for lat, lon in positions)
+        if model.generation == self._generation and locations == self._locations:
+            return
+        moved = locations != self._locations
+        self._generation = model.generation
+        self._locations = locations
+
+        seen = set()
+        new = []
+        for source, alert_id, item, lat, lon in alert_positions(model):
+            key = (source, alert_id)
+            entity = self.entities.get(key)
+            if entity is not None and entity.item is item and not moved:
+                seen.add(key)
+                continue
+            distance_km = min(
+                haversine(p_lat, p_lon, lat, lon) for p_lat, p_lon in positions
+            ) / 1000
+            if distance_km > self.radius_km:
+                continue
+            seen.add(key)
+            if entity is None:
+                entity = self.entities[key] = NLAlertGeoLocation(source, alert_id)
+                entity.set_alert(item, lat, lon, distance_km)
+                new.append(entity)
+            elif entity.item is not item or abs(entity.distance - distance_km) >= 1:
+                # A new version of the alert, or a noticeable change in distance
+                entity.set_alert(item, lat, lon, distance_km)
+                entity.async_write_ha_state()
+
+        for key in [key for key in self.entities if key not in seen]:
+            entity = self.entities.pop(key)
+            self.hass.async_create_task(entity.async_remove())
+
+        if new:
+            self._async_add_entities(new)
+        _LOGGER.debug(
+            "geo_location: %d alerts near %s (%d new)",
+            len(self.entities), self.coordinator.entry.title, len(new),
+        )
+
+
+class NLAlertGeoLocation(GeolocationEvent):
+    """One active Burgernet circle or NL-Alert area on the map."""
+
+    _attr_should_poll = False
+    _attr_source = DOMAIN
+    _attr_unit_of_measurement = UnitOfLength.KILOMETERS
+
+    def __init__(self, source, alert_id):
+        self.alert_source = source
+        self.alert_id = alert_id
+        self.item = None
+        self._attr_icon = "mdi:account-search" if source == "burgernet" else "mdi:alert"
+
+    @callback
+    def set_alert(self, item, lat, lon, distance_km):
+        """Point this entity at a (new version of an) alert."""
+        self.item = item
+        self._attr_latitude = lat
+        self._attr_longitude = lon
+        self._attr_distance = round(distance_km, 1)
+        attrs = {"alert_source": self.alert_source, "alert_id": self.alert_id}
+        if self.alert_source == "burgernet":
+            msg = item.get("Message") or {}
+            self._attr_name = msg.get("Title") or f"Burgernet {self.alert_id}"
+            attrs["level"] = item.get("AlertLevel")
+        else:
+            message = item.get("message") or ""
+            self._attr_name = message.split("\n", 1)[0][:60] or f"NL-Alert {self.alert_id}"
+        self._attr_extra_state_attributes = attrs
@@ -0,0 +1,301 @@
+# custom_components/nl_alert/geometry.py
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ships with HA core, but stay usable without it
+    np = None
+
+EARTH_RADIUS_M = 6371000
+# Meters per degree of latitude
+M_PER_DEG = EARTH_RADIUS_M * math.pi / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Return distance in meters between two lat/lon points."""
+    φ1, φ2 = math.radians(lat1), math.radians(lat2)
+    Δφ = math.radians(lat2 - lat1)
+    Δλ = math.radians(lon2 - lon1)
+    a = math.sin(Δφ / 2) ** 2 + math.cos(φ1) * math.cos(φ2) * math.sin(Δλ / 2) ** 2
+    return EARTH_RADIUS_M * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+
+
+def haversine_rad(φ1, λ1, cos_φ1, φ2, λ2, cos_φ2):
+    """
+    Same as `haversine`, but for points already in radians with their
+    latitude cosines precomputed (as stored on compiled alerts).
+    """
+    a = math.sin((φ2 - φ1) / 2) ** 2 + cos_φ1 * cos_φ2 * math.sin((λ2 - λ1) / 2) ** 2
+    return EARTH_RADIUS_M * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+
+
+def point_in_polygon(lat, lon, polygon):
+    """
+    Ray-casting algorithm to check if (lat, lon) is inside `polygon`.
+    `polygon` is a list of (lat, lon) tuples. Returns True if inside or on edge.
+    """
+    inside = False
+    n = len(polygon)
+    for i in range(n):
+        j = (i + n - 1) % n
+        yi, xi = polygon[i]
+        yj, xj = polygon[j]
+        # Check if the ray crosses the edge
+        intersect = ((xi > lon) != (xj > lon)) and (
+            lat < (yj - yi) * (lon - xi) / (xj - xi + 1e-12) + yi
+        )
+        if intersect:
+            inside = not inside
+    return inside
+
+
+def point_in_polygon_arrays(lat, lon, lats, lons):
+    """
+    Same ray cast as `point_in_polygon`, over parallel `lats` / `lons`
+    coordinate buffers instead of a list of tuples.
+    """
+    inside = False
+    n = len(lats)
+    j = n - 1
+    for i in range(n):
+        xi = lons[i]
+        xj = lons[j]
+        if (xi > lon) != (xj > lon):
+            yi = lats[i]
+            if lat < (lats[j] - yi) * (lon - xi) / (xj - xi + 1e-12) + yi:
+                inside = not inside
+        j = i
+    return inside
+
+
+def batch_haversine(points, centres):
+    """
+    Distances in meters from N `points` to M `centres` (both sequences of
+    (lat, lon)). Returns an N x M ndarray, or a list of lists without NumPy.
+    Matching goes through `GridIndex` instead, which leaves a handful of
+    candidates per point; this dense form is the batch API and benchmark
+    reference.
+    """
+    if np is None:
+        return [
+            [haversine(lat, lon, clat, clon) for clat, clon in centres]
+            for lat, lon in points
+        ]
+
+    p = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    c = np.radians(np.asarray(centres, dtype=float).reshape(-1, 2))
+    φ1, λ1 = p[:, 0:1], p[:, 1:2]
+    φ2, λ2 = c[:, 0], c[:, 1]
+    a = np.sin((φ2 - φ1) / 2) ** 2 + np.cos(φ1) * np.cos(φ2) * np.sin((λ2 - λ1) / 2) ** 2
+    return EARTH_RADIUS_M * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+
+
+def bbox_distance(lat, lon, min_lat, max_lat, min_lon, max_lon):
+    """Approximate distance in meters from (lat, lon) to a bounding box (0 inside)."""
+    dy = max(min_lat - lat, 0.0, lat - max_lat) * M_PER_DEG
+    dx = max(min_lon - lon, 0.0, lon - max_lon) * M_PER_DEG * math.cos(math.radians(lat))
+    return math.hypot(dx, dy)
+
+
+def polygon_edge_distance(lat, lon, lats, lons):
+    """
+    Approximate distance in meters from (lat, lon) to the nearest edge of a
+    polygon, in a local equirectangular projection centred on the point.
+    Accurate to well under a percent over the few km this is used for.
+    """
+    kx = M_PER_DEG * math.cos(math.radians(lat))
+    n = len(lats)
+
+    if np is not None and n >= 64:
+        x = (np.asarray(lons, dtype=float) - lon) * kx
+        y = (np.asarray(lats, dtype=float) - lat) * M_PER_DEG
+        dx = np.roll(x, 1) - x
+        dy = np.roll(y, 1) - y
+        seg = dx * dx + dy * dy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.where(seg > 0, -(x * dx + y * dy) / seg, 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        return float(np.sqrt(np.min((x + t * dx) ** 2 + (y + t * dy) ** 2)))
+
+    best = math.inf
+    xj = (lons[n - 1] - lon) * kx
+    yj = (lats[n - 1] - lat) * M_PER_DEG
+    for i in range(n):
+        xi = (lons[i] - lon) * kx
+        yi = (lats[i] - lat) * M_PER_DEG
+        dx = xj - xi
+        dy = yj - yi
+        seg = dx * dx + dy * dy
+        t = min(max(-(xi * dx + yi * dy) / seg, 0.0), 1.0) if seg > 0 else 0.0
+        px = xi + t * dx
+        py = yi + t * dy
+        best = min(best, px * px + py * py)
+        xj, yj = xi, yi
+    return math.sqrt(best)
+
+
+def polygon_centroid(lats, lons):
+    """
+    Planar centroid (lat, lon) and area in square degrees of a polygon.
+    Degenerate polygons fall back to the mean of their vertices.
+    """
+    n = len(lats)
+    # Relative to the first vertex, to keep the cross products well scaled
+    lat0, lon0 = lats[0], lons[0]
+
+    if np is not None and n >= 64:
+        x = np.asarray(lons, dtype=float) - lon0
+        y = np.asarray(lats, dtype=float) - lat0
+        xj = np.roll(x, 1)
+        yj = np.roll(y, 1)
+        cross = xj * y - x * yj
+        area2 = float(cross.sum())
+        cx = float(((xj + x) * cross).sum())
+        cy = float(((yj + y) * cross).sum())
+    else:
+        area2 = cx = cy = 0.0
+        xj = lons[n - 1] - lon0
+        yj = lats[n - 1] - lat0
+        for i in range(n):
+            xi = lons[i] - lon0
+            yi = lats[i] - lat0
+            cross = xj * yi - xi * yj
+            area2 += cross
+            cx += (xj + xi) * cross
+            cy += (yj + yi) * cross
+            xj, yj = xi, yi
+
+    if abs(area2) < 1e-12:
+        return sum(lats) / n, sum(lons) / n, 0.0
+    return lat0 + cy / (3 * area2), lon0 + cx / (3 * area2), abs(area2) / 2
+
+
+# Upper bound on points x edges evaluated per NumPy chunk
+_BATCH_CHUNK = 1 << 20
+
+
+def batch_point_in_polygon(points, lats, lons):
+    """
+    Containment of N `points` in one polygon given as parallel `lats` /
+    `lons` buffers. Returns a length-N bool ndarray, or a list without NumPy.
+    Matching uses the banded `EdgeTable` instead, which is cheaper at any
+    batch size; this dense form is the batch API and benchmark reference.
+    """
+    if np is None:
+        return [point_in_polygon_arrays(lat, lon, lats, lons) for lat, lon in points]
+
+    p = np.asarray(points, dtype=float).reshape(-1, 2)
+    yi = np.asarray(lats, dtype=float)
+    xi = np.asarray(lons, dtype=float)
+    # Edge i runs from vertex i-1 to vertex i, as in `point_in_polygon`
+    yj = np.roll(yi, 1)
+    xj = np.roll(xi, 1)
+    slope = (yj - yi) / (xj - xi + 1e-12)
+
+    result = np.zeros(len(p), dtype=bool)
+    step = max(1, _BATCH_CHUNK // max(1, len(xi)))
+    for start in range(0, len(p), step):
+        y = p[start:start + step, 0:1]
+        x = p[start:start + step, 1:2]
+        hits = ((xi > x) != (xj > x)) & (y < slope * (x - xi) + yi)
+        result[start:start + step] = np.count_nonzero(hits, axis=1) % 2 == 1
+    return result
+
+
+class EdgeTable:
+    """
+    Polygon edges bucketed into longitude bands, with the ray-cast slope of
+    each edge precomputed. A containment test only walks the edges whose
+    longitude range can straddle the query point, and does no division.
+    """
+
+    __slots__ = ("min_lon", "width", "buckets")
+
+    def __init__(self, lats, lons, edges_per_bucket=16):
+        n = len(lats)
+        count = max(1, n // edges_per_bucket)
+        self.min_lon = min(lons)
+        self.width = (max(lons) - self.min_lon) / count or 1.0
+        # Each bucket is a flat buffer of (xi, xj, yi, slope) quadruples
+        self.buckets = [array("d") for _ in range(count)]
+
+        j = n - 1
+        for i in range(n):
+            xi, xj = lons[i], lons[j]
+            if xi != xj:
+                yi = lats[i]
+                slope = (lats[j] - yi) / (xj - xi + 1e-12)
+                first = self._bucket(min(xi, xj))
+                last = self._bucket(max(xi, xj))
+                for b in range(first, last + 1):
+                    self.buckets[b].extend((xi, xj, yi, slope))
+            j = i
+
+    def _bucket(self, lon):
+        b = int((lon - self.min_lon) / self.width)
+        return min(max(b, 0), len(self.buckets) - 1)
+
+    def contains(self, lat, lon):
+        """Ray cast (lat, lon) against the edges of its longitude band."""
+        inside = False
+        edges = self.buckets[self._bucket(lon)]
+        for k in range(0, len(edges), 4):
+            xi = edges[k]
+            if (xi > lon) != (edges[k + 1] > lon):
+                if lat < edges[k + 3] * (lon - xi) + edges[k + 2]:
+                    inside = not inside
+        return inside
+
+
+class GridIndex:
+    """
+    Uniform lat/lon grid over objects exposing `min_lat`, `max_lat`,
+    `min_lon` and `max_lon`. `candidates` returns the indices (in input
+    order) of the objects whose bounding box touches the query's cell.
+    """
+
+    __slots__ = ("cell_deg", "cells", "oversized")
+
+    # Objects covering more cells than this are always returned as candidates
+    MAX_CELLS_PER_ITEM = 4096
+
+    def __init__(self, items, cell_deg=0.25):
+        self.cell_deg = cell_deg
+        self.cells = {}
+        self.oversized = []
+        for idx, item in enumerate(items):
+            lat0, lat1 = self._cell(item.min_lat), self._cell(item.max_lat)
+            lon0, lon1 = self._cell(item.min_lon), self._cell(item.max_lon)
+            if (lat1 - lat0 + 1) * (lon1 - lon0 + 1) > self.MAX_CELLS_PER_ITEM:
+                self.oversized.append(idx)
+                continue
+            for ci in range(lat0, lat1 + 1):
+                for cj in range(lon0, lon1 + 1):
+                    self.cells.setdefault((ci, cj), []).append(idx)
+
+    def _cell(self, value):
+        return math.floor(value / self.cell_deg)
+
+    def candidates(self, lat, lon):
+        """Return the sorted indices of objects that may contain (lat, lon)."""
+        hits = self.cells.get((self._cell(lat), self._cell(lon)), ())
+        if not self.oversized:
+            return hits
+        return sorted(set(hits).union(self.oversized))
+
+    def near(self, lat, lon, radius_m):
+        """
+        Return the sorted indices of objects whose bounding box may lie
+        within `radius_m` of (lat, lon): those in any cell the query circle
+        touches.
+        """
+        dlat = radius_m / M_PER_DEG
+        # Widest longitude span of the circle, at its pole-ward edge
+        dlon = dlat / max(math.cos(math.radians(min(abs(lat) + dlat, 89.0))), 1e-6)
+        found = set(self.oversized)
+        for ci in range(self._cell(lat - dlat), self._cell(lat + dlat) + 1):
+            for cj in range(self._cell(lon - dlon), self._cell(lon + dlon) + 1):
+                found.update(self.cells.get((ci, cj), ()))
+        return sorted(found)
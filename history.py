@@ -0,0 +1,235 @@
+# custom_components/nl_alert/history.py
+
+import bisect
+import logging
+import time
+from collections import OrderedDict
+
+from .geometry import bbox_distance, haversine
+
+_LOGGER = logging.getLogger(__name__)
+
+# Longest NL-Alert message excerpt kept per entry
+TITLE_LENGTH = 120
+
+
+def summarize(source, item, compiled):
+    """Title and compact geometry of one alert; polygons become a bounding box."""
+    if source == "burgernet":
+        msg = item.get("Message") or {}
+        summary = {"title": msg.get("Title"), "level": item.get("AlertLevel")}
+        if compiled and compiled[0].radius_m is not None:
+            circle = compiled[0]
+            summary["circle"] = [round(circle.lat, 5), round(circle.lon, 5), circle.radius_m]
+        return summary
+
+    message = item.get("message") or ""
+    summary = {"title": message.split("\n", 1)[0][:TITLE_LENGTH]}
+    if compiled:
+        summary["bbox"] = [
+            min(polygon.min_lat for polygon in compiled),
+            max(polygon.max_lat for polygon in compiled),
+            min(polygon.min_lon for polygon in compiled),
+            max(polygon.max_lon for polygon in compiled),
+        ]
+        summary["vertices"] = sum(len(polygon.lats) for polygon in compiled)
+    return summary
+
+
+def distance_m(entry, lat, lon):
+    """
+    Distance in meters from (lat, lon) to an entry's area (0 inside), or
+    None if the entry has no geometry. National alerts are everywhere.
+    """
+    if "circle" in entry:
+        clat, clon, radius_m = entry["circle"]
+        return max(0.0, haversine(lat, lon, clat, clon) - radius_m)
+    if "bbox" in entry:
+        return bbox_distance(lat, lon, *entry["bbox"])
+    if entry.get("level") == 10:
+        return 0.0
+    return None
+
+
+class AlertHistory:
+    """
+    Bounded record of the alerts seen in the feeds, keyed by (source, alert
+    id). Entries are kept in least-recently-updated order for eviction, with
+    a separate index sorted on first-seen time for range queries. Ended
+    alerts older than `max_age` are dropped, and beyond `max_entries` the
+    least recently updated ones go first, so memory stays bounded.
+    """
+
+    def __init__(self, max_entries, max_age_days):
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        # (source, alert_id) -> entry dict, least recently updated first
+        self._entries = OrderedDict()
+        # Parallel lists sorted on first_seen: times and their keys
+        self._times = []
+        self._keys = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, entries, now=None):
+        """Adopt entries persisted by `as_list`, then apply the caps."""
+        for entry in entries:
+            key = (entry["source"], entry["alert_id"])
+            self._entries[key] = entry
+            self._index_add(entry["first_seen"], key)
+        self._evict(now or time.time())
+
+    def as_list(self):
+        """All entries in eviction order, for persisting."""
+        return list(self._entries.values())
+
+    def record(self, source, feed, now=None):
+        """
+        Apply the diff of a CompiledFeed: new and changed alerts are
+        (re)summarized, removed ones are closed. Returns True if the
+        history changed.
+        """
+        now = now or time.time()
+        changed = False
+        for key in feed.added + feed.changed:
+            if _synthetic(key):
+                continue
+            item, compiled = feed.entries[key]
+            self._touch(source, key, summarize(source, item, compiled), now)
+            changed = True
+
+        ended = list(feed.removed)
+        if feed.initial:
+            # First feed after a restart: close alerts that ended meanwhile
+            ended += [
+                alert_id for (entry_source, alert_id), entry in self._entries.items()
+                if entry_source == source and entry["active"]
+                and alert_id not in feed.entries
+            ]
+        for key in ended:
+            entry = self._entries.get((source, key))
+            if entry is not None and entry["active"]:
+                entry["active"] = False
+                entry["last_seen"] = now
+                self._entries.move_to_end((source, key))
+                changed = True
+
+        return self._evict(now) or changed
+
+    def mark_matched(self, source, alert_id):
+        """Flag an alert as having matched a tracked location. True if new."""
+        entry = self._entries.get((source, alert_id))
+        if entry is None or entry["matched"]:
+            return False
+        entry["matched"] = True
+        return True
+
+    def query(
+        self,
+        start=None,
+        end=None,
+        lat=None,
+        lon=None,
+        max_distance_m=None,
+        source=None,
+        matched_only=False,
+        now=None,
+    ):
+        """
+        Entries active at some point in [start, end] (epoch seconds, open
+        ended when None), optionally within `max_distance_m` of (lat, lon),
+        sorted on first-seen time. Each result is a copy, with `last_seen`
+        at `now` for active alerts and `distance_m` added when a location is
+        given.
+        """
+        now = now or time.time()
+        stop = len(self._times) if end is None else bisect.bisect_right(self._times, end)
+        results = []
+        for key in self._keys[:stop]:
+            entry = self._entries[key]
+            if start is not None and (now if entry["active"] else entry["last_seen"]) < start:
+                continue
+            if source is not None and entry["source"] != source:
+                continue
+            if matched_only and not entry["matched"]:
+                continue
+            result = dict(entry)
+            if entry["active"]:
+                result["last_seen"] = now
+            if lat is not None and lon is not None:
+                distance = distance_m(entry, lat, lon)
+                if max_distance_m is not None and (distance is None or distance > max_distance_m):
+                    continue
+                result["distance_m"] = None if distance is None else round(distance)
+            results.append(result)
+        return results
+
+    def _touch(self, source, alert_id, summary, now):
+        key = (source, alert_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = {
+                "source": source,
+                "alert_id": alert_id,
+                "first_seen": now,
+                "matched": False,
+            }
+            self._index_add(now, key)
+        else:
+            self._entries.move_to_end(key)
+            # Drop geometry fields a newer version may no longer have
+            for field in ("circle", "bbox", "vertices"):
+                entry.pop(field, None)
+        entry.update(summary)
+        entry["last_seen"] = now
+        entry["active"] = True
+
+    def _index_add(self, first_seen, key):
+        pos = bisect.bisect_right(self._times, first_seen)
+        self._times.insert(pos, first_seen)
+        self._keys.insert(pos, key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        pos = bisect.bisect_left(self._times, entry["first_seen"])
+        while self._keys[pos] != key:
+            pos += 1
+        del self._times[pos]
+        del self._keys[pos]
+
+    def _evict(self, now):
+        """Apply the age and size caps. Returns True if anything was dropped."""
+        before = len(self._entries)
+        cutoff = now - self.max_age
+        # Ended entries sit in the order they ended, so stop at the first recent one
+        expired = []
+        for key, entry in self._entries.items():
+            if entry["active"]:
+                continue
+            if entry["last_seen"] >= cutoff:
+                break
+            expired.append(key)
+        for key in expired:
+            self._remove(key)
+
+        excess = len(self._entries) - int(self.max_entries)
+        if excess > 0:
+            # Least recently updated ended alerts first, then active ones
+            ended = [key for key, entry in self._entries.items() if not entry["active"]]
+            victims = ended[:excess]
+            if len(victims) < excess:
+                active = [key for key, entry in self._entries.items() if entry["active"]]
+                victims += active[:excess - len(victims)]
+            for key in victims:
+                self._remove(key)
+
+        if len(self._entries) < before:
+            _LOGGER.debug("Evicted %d alerts from history", before - len(self._entries))
+            return True
+        return False
+
+
+def _synthetic(key):
+    """Feed keys made up for items without an id (see `compile_feed`)."""
+    return isinstance(key, str) and key.startswith("#")
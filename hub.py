@@ -0,0 +1,375 @@
+# custom_components/nl_alert/hub.py
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    SOURCES,
+    DEFAULT_INLINE_LIMIT,
+    STORAGE_VERSION,
+    STORAGE_KEY,
+    CACHE_MAX_AGE,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_MAX_INTERVAL,
+    SLOW_CYCLE_MS,
+    HISTORY_STORAGE_KEY,
+    REFRESH_MIN_INTERVAL,
+    DEFAULT_HISTORY_SIZE,
+    DEFAULT_HISTORY_DAYS,
+)
+from .decode import decode_json, decode_nl_alert
+from .history import AlertHistory
+from .model import AlertModel, ResultCache, compile_burgernet, compile_nl_alert
+from .pipeline import RetryLater, SourcePipeline
+from .scheduler import PollScheduler
+from .stats import elapsed_ms
+
+_LOGGER = logging.getLogger(__name__)
+
+# How each source's payload is compiled into the alert model
+COMPILERS = {
+    "burgernet": compile_burgernet,
+    "nl_alert": compile_nl_alert,
+}
+
+# Sources with a filtering decoder; others are decoded as plain JSON
+DECODERS = {
+    "nl_alert": decode_nl_alert,
+}
+
+# Never wake up more often than this, even if a source is overdue
+MIN_WAKEUP = timedelta(seconds=1)
+# Coalesce cache writes after changed payloads
+SAVE_DELAY = 30
+
+
+class NLAlertHub(DataUpdateCoordinator):
+    """
+    Domain-wide owner of the upstream fetch and the compiled alert model.
+
+    The feeds are global, so every config entry subscribes to this one hub
+    and only evaluates its own locations. Upstream load stays constant no
+    matter how many entries are configured.
+    """
+
+    def __init__(self, hass):
+        self.pipelines = {
+            source: SourcePipeline(
+                hass,
+                source,
+                spec["url"],
+                spec["timeout"],
+                PollScheduler(
+                    timedelta(minutes=DEFAULT_MIN_INTERVAL),
+                    timedelta(minutes=DEFAULT_MAX_INTERVAL),
+                ),
+                COMPILERS[source],
+                DECODERS.get(source, decode_json),
+                DEFAULT_INLINE_LIMIT * 1024,
+            )
+            for source, spec in SOURCES.items()
+        }
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(minutes=DEFAULT_MIN_INTERVAL),
+        )
+        # HA's shared (keep-alive) client session instead of one per poll
+        self._session = async_get_clientsession(hass)
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # Bumped whenever a new alert model is compiled
+        self._generation = 0
+        # Verdict cache shared by all entries (keyed on location and radius)
+        self.results = ResultCache()
+        # Every alert seen in the feeds, persisted separately from the payloads
+        self.history = AlertHistory(DEFAULT_HISTORY_SIZE, DEFAULT_HISTORY_DAYS)
+        self._history_store = Store(hass, STORAGE_VERSION, HISTORY_STORAGE_KEY)
+        # Config of each subscribed entry, by entry_id
+        self._subscribers = {}
+        self._start_lock = asyncio.Lock()
+        # In-flight on-demand refresh, shared by concurrent callers
+        self._forced = None
+        # Duration of the last refresh cycle, and whether slow ones are logged
+        self.last_cycle_ms = None
+        self.model_ms = None
+        self.log_slow_cycles = False
+
+    @callback
+    def async_subscribe(self, entry_id, config):
+        """Register an entry and apply the most demanding poll settings."""
+        self._subscribers[entry_id] = config
+        self._configure()
+
+    @callback
+    def async_unsubscribe(self, entry_id):
+        """Drop an entry. Returns the number of entries still subscribed."""
+        self._subscribers.pop(entry_id, None)
+        if self._subscribers:
+            self._configure()
+        return len(self._subscribers)
+
+    def _configure(self):
+        configs = list(self._subscribers.values())
+        self.log_slow_cycles = any(c.get("log_slow_cycles", False) for c in configs)
+        # Number selectors store floats; the size is used for slicing
+        self.history.max_entries = int(max(
+            c.get("history_size", DEFAULT_HISTORY_SIZE) for c in configs
+        ))
+        self.history.max_age = 86400 * int(max(
+            c.get("history_days", DEFAULT_HISTORY_DAYS) for c in configs
+        ))
+        for source, pipeline in self.pipelines.items():
+            scheduler = pipeline.scheduler
+            scheduler.min_interval = timedelta(minutes=min(
+                c.get(f"{source}_min_interval", DEFAULT_MIN_INTERVAL) for c in configs
+            ))
+            scheduler.max_interval = max(scheduler.min_interval, timedelta(minutes=min(
+                c.get(f"{source}_max_interval", DEFAULT_MAX_INTERVAL) for c in configs
+            )))
+            pipeline.inline_limit = 1024 * min(
+                c.get("inline_limit", DEFAULT_INLINE_LIMIT) for c in configs
+            )
+
+    async def async_start(self):
+        """
+        Bring the hub up once: restore the on-disk cache and refresh in the
+        background, or block on a first refresh when there is no cache.
+        """
+        async with self._start_lock:
+            if self.data is not None:
+                return
+            stored = await self._history_store.async_load()
+            if stored:
+                self.history.load(stored.get("alerts", []))
+            if await self.async_restore():
+                self.hass.async_create_background_task(
+                    self.async_refresh(), f"{DOMAIN} initial refresh"
+                )
+            else:
+                await self.async_refresh()
+
+    async def async_refresh_now(self):
+        """
+        Fetch every source now, except those requested less than
+        REFRESH_MIN_INTERVAL ago or told to back off with Retry-After.
+        Concurrent callers share one in-flight refresh. Returns the sources
+        that were fetched.
+        """
+        if self._forced is None:
+            self._forced = self.hass.async_create_task(
+                self._async_refresh_now(), f"{DOMAIN} on-demand refresh"
+            )
+            self._forced.add_done_callback(self._clear_forced)
+        return await asyncio.shield(self._forced)
+
+    @callback
+    def _clear_forced(self, task):
+        self._forced = None
+
+    async def _async_refresh_now(self):
+        # A fetch already under way is as fresh as a forced one; wait for it
+        # rather than requesting the same feed again
+        fetched = [p.source for p in self.pipelines.values() if p.in_flight]
+        await asyncio.gather(*(p.async_wait() for p in self.pipelines.values()))
+        now = dt_util.utcnow()
+        for pipeline in self.pipelines.values():
+            if pipeline.source in fetched:
+                continue
+            if (
+                pipeline.requested_at is not None
+                and now - pipeline.requested_at < timedelta(seconds=REFRESH_MIN_INTERVAL)
+            ):
+                continue
+            if isinstance(pipeline.last_error, RetryLater) and not pipeline.due(now):
+                continue
+            pipeline.next_due = now
+            fetched.append(pipeline.source)
+        if any(p.due(now) and not p.in_flight for p in self.pipelines.values()):
+            await self.async_refresh()
+        # A scheduled cycle may have picked up a forced source meanwhile
+        await asyncio.gather(*(p.async_wait() for p in self.pipelines.values()))
+        return fetched
+
+    async def async_restore(self):
+        """
+        Load the last persisted payloads and publish them right away, so the
+        entities have state before the first network refresh. Returns True
+        if anything was restored.
+        """
+        stored = await self._store.async_load() or {}
+        oldest = dt_util.utcnow() - timedelta(hours=CACHE_MAX_AGE)
+        restored = []
+        for source, pipeline in self.pipelines.items():
+            cached = stored.get(source)
+            if not cached or cached.get("payload") is None:
+                continue
+            fetched_at = dt_util.parse_datetime(cached.get("fetched_at") or "")
+            if fetched_at is None or fetched_at < oldest:
+                continue
+            await pipeline.async_restore(cached)
+            restored.append(source)
+
+        if restored:
+            _LOGGER.debug("Restored cached %s payloads; refreshing in background", restored)
+            self.async_set_updated_data(self._merge(restored))
+        return bool(restored)
+
+    async def async_shutdown(self):
+        """
+        Stop polling and write both stores now. This also cancels their
+        pending delayed saves, which would otherwise be lost on a reload or
+        recreate the files after the last entry is removed.
+        """
+        await super().async_shutdown()
+        for pipeline in self.pipelines.values():
+            pipeline.async_cancel()
+        data = self._data_to_store()
+        if data:
+            await self._store.async_save(data)
+        await self._history_store.async_save({"alerts": self.history.as_list()})
+
+    @callback
+    def async_save_history(self):
+        """Persist the alert history after the save delay."""
+        self._history_store.async_delay_save(
+            lambda: {"alerts": self.history.as_list()}, SAVE_DELAY
+        )
+
+    @callback
+    def _data_to_store(self):
+        return {
+            source: pipeline.as_dict()
+            for source, pipeline in self.pipelines.items()
+            if pipeline.payload is not None
+        }
+
+    async def _async_update_data(self):
+        """
+        Refresh the sources that are due, each with its own timeout, and
+        merge every source's last good data into one view for the entries.
+        A source that finishes while another is still being fetched is
+        published right away, so a slow upstream never delays a fast one.
+        """
+        start = time.perf_counter()
+        now = dt_util.utcnow()
+        # A source still being fetched by an overlapping cycle (e.g. a forced
+        # refresh) reports its result there
+        due = [p for p in self.pipelines.values() if p.due(now) and not p.in_flight]
+        pending = {
+            asyncio.ensure_future(p.async_refresh(self._session)): p for p in due
+        }
+        changed_sources = []
+        unpublished = []
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result():
+                        changed_sources.append(pending[task].source)
+                        unpublished.append(pending[task].source)
+                    del pending[task]
+                if pending and unpublished:
+                    self.async_set_updated_data(self._merge(unpublished))
+                    unpublished = []
+        finally:
+            for task in pending:
+                task.cancel()
+        self.last_cycle_ms = elapsed_ms(start)
+        if self.log_slow_cycles and self.last_cycle_ms >= SLOW_CYCLE_MS:
+            _LOGGER.warning(
+                "Slow refresh cycle: %s ms; %s",
+                self.last_cycle_ms,
+                "; ".join(f"{p.source}: {p.stats.summary()}" for p in due),
+            )
+
+        # Wake up again when the next source is due; one whose first fetch is
+        # still under way elsewhere has no schedule yet
+        next_due = min(
+            (p.next_due for p in self.pipelines.values() if p.next_due is not None),
+            default=now,
+        )
+        self.update_interval = max(next_due - dt_util.utcnow(), MIN_WAKEUP)
+
+        if all(p.payload is None for p in self.pipelines.values()):
+            errors = ", ".join(
+                f"{p.source}: {p.last_error!r}" for p in self.pipelines.values()
+            )
+            raise UpdateFailed(f"No source has returned data yet ({errors})")
+
+        if changed_sources:
+            self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+        return self._merge(unpublished)
+
+    def _merge(self, changed_sources):
+        """
+        Merge every source's last good data into one snapshot. `changes`
+        holds the compiled feeds (with their diffs) of the sources that
+        changed in this refresh, except first snapshots after startup.
+        """
+        previous = self.data or {}
+        recorded = [
+            self.history.record(source, self.pipelines[source].compiled)
+            for source in changed_sources
+            if self.pipelines[source].compiled is not None
+        ]
+        if any(recorded):
+            self.async_save_history()
+
+        if changed_sources or "model" not in previous:
+            self._generation += 1
+            start = time.perf_counter()
+            model = AlertModel(
+                *(
+                    self.pipelines[source].compiled.alerts()
+                    if self.pipelines[source].compiled is not None else []
+                    for source in ("burgernet", "nl_alert")
+                ),
+                self._generation,
+            )
+            self.model_ms = elapsed_ms(start)
+        else:
+            # Nothing new (304s or errors); keep the compiled model as well
+            model = previous["model"]
+
+        data = {source: p.payload for source, p in self.pipelines.items()}
+        data["model"] = model
+        data["changes"] = {
+            source: self.pipelines[source].compiled
+            for source in changed_sources
+            if not self.pipelines[source].compiled.initial
+        }
+        return data
+
+    def diagnostics(self):
+        """Per-source fetch statistics, cycle timings and verdict cache use."""
+        return {
+            "generation": self._generation,
+            "subscribers": len(self._subscribers),
+            "last_cycle_ms": self.last_cycle_ms,
+            "model_ms": self.model_ms,
+            "sources": {
+                source: {
+                    "alerts": len(pipeline.compiled) if pipeline.compiled else 0,
+                    "fetched_at": pipeline.fetched_at,
+                    "next_due": pipeline.next_due,
+                    "last_error": repr(pipeline.last_error) if pipeline.last_error else None,
+                    "min_interval": str(pipeline.scheduler.min_interval),
+                    "max_interval": str(pipeline.scheduler.max_interval),
+                    "inline_limit": pipeline.inline_limit,
+                    **pipeline.stats.as_dict(),
+                }
+                for source, pipeline in self.pipelines.items()
+            },
+            "result_cache": self.results.as_dict(),
+            "history_entries": len(self.history),
+        }
@@ -0,0 +1,478 @@
+# custom_components/nl_alert/model.py
+
+import logging
+import math
+from array import array
+
+from .geometry import (
+    EdgeTable,
+    GridIndex,
+    bbox_distance,
+    haversine,
+    M_PER_DEG,
+    haversine_rad,
+    polygon_centroid,
+    polygon_edge_distance,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Locations are rounded to this many decimals (~1 m) for result caching
+LOCATION_PRECISION = 5
+# Safe radii are capped, and shrunk to absorb the projection approximation
+SAFE_RADIUS_MAX_M = 10000
+SAFE_RADIUS_FACTOR = 0.9
+# Slack on the equirectangular reject so it never drops a true match
+REJECT_SLACK = 1.01
+
+
+class BurgernetAlert:
+    """A Burgernet alert with its `Area.Circle` parsed once."""
+
+    __slots__ = (
+        "alert", "alert_id", "level", "national",
+        "lat", "lon", "lat_rad", "lon_rad", "cos_lat", "radius_m",
+        "min_lat", "max_lat", "min_lon", "max_lon",
+    )
+
+    def __init__(self, alert, level, circle):
+        self.alert = alert
+        self.alert_id = alert.get("AlertId")
+        self.level = level
+        # National Amber (level 10) applies everywhere
+        self.national = level == 10
+        if circle is None:
+            self.lat = self.lon = self.lat_rad = self.lon_rad = None
+            self.cos_lat = self.radius_m = None
+            self.min_lat = self.max_lat = self.min_lon = self.max_lon = None
+        else:
+            self.lat, self.lon, self.radius_m = circle
+            self.lat_rad = math.radians(self.lat)
+            self.lon_rad = math.radians(self.lon)
+            self.cos_lat = math.cos(self.lat_rad)
+            # Bounding box of the circle, for the grid index
+            dlat = self.radius_m / M_PER_DEG
+            edge_cos = math.cos(math.radians(min(abs(self.lat) + dlat, 89.9)))
+            dlon = min(dlat / edge_cos, 180.0)
+            self.min_lat, self.max_lat = self.lat - dlat, self.lat + dlat
+            self.min_lon, self.max_lon = self.lon - dlon, self.lon + dlon
+
+    def distance_m(self, lat_rad, lon_rad, cos_lat):
+        """Great-circle distance from a point (in radians) to the circle centre."""
+        return haversine_rad(
+            lat_rad, lon_rad, cos_lat, self.lat_rad, self.lon_rad, self.cos_lat
+        )
+
+    def rejects(self, lat, lon, cos_lat, limit_m):
+        """
+        Cheap equirectangular test: True if (lat, lon) is certainly further
+        than `limit_m` from the centre, so the haversine can be skipped.
+        """
+        if abs(lat - self.lat) * M_PER_DEG > limit_m * REJECT_SLACK:
+            return True
+        dlon = abs(lon - self.lon)
+        dlon = min(dlon, 360.0 - dlon)
+        return dlon * M_PER_DEG * min(cos_lat, self.cos_lat) > limit_m * REJECT_SLACK
+
+    def matches(self, lat, lon, max_radius_m):
+        """True if this alert applies at (lat, lon) within `max_radius_m`."""
+        if self.national:
+            return True
+        if self.radius_m is None:
+            return False
+        lat_rad = math.radians(lat)
+        distance = self.distance_m(lat_rad, math.radians(lon), math.cos(lat_rad))
+        return distance <= self.radius_m and distance <= max_radius_m
+
+
+class NLAlertPolygon:
+    """One `area` polygon of an active NL-Alert item, as coordinate buffers."""
+
+    __slots__ = (
+        "item", "lats", "lons", "edges",
+        "min_lat", "max_lat", "min_lon", "max_lon", "_centroid",
+    )
+
+    def __init__(self, item, lats, lons):
+        self.item = item
+        self.lats = lats
+        self.lons = lons
+        self.edges = EdgeTable(lats, lons)
+        self.min_lat, self.max_lat = min(lats), max(lats)
+        self.min_lon, self.max_lon = min(lons), max(lons)
+        self._centroid = None
+
+    def contains(self, lat, lon):
+        """Return True if (lat, lon) lies inside this polygon."""
+        if not (
+            self.min_lat <= lat <= self.max_lat
+            and self.min_lon <= lon <= self.max_lon
+        ):
+            return False
+        return self.edges.contains(lat, lon)
+
+    def centroid(self):
+        """(lat, lon, area) of this polygon, computed on first use."""
+        if self._centroid is None:
+            self._centroid = polygon_centroid(self.lats, self.lons)
+        return self._centroid
+
+    def matches(self, lat, lon, max_radius_m=None):
+        """Same as `contains`; NL-Alert areas ignore the Burgernet radius."""
+        return self.contains(lat, lon)
+
+    def contains_many(self, points):
+        """
+        Containment of several (lat, lon) points. Each one walks only the
+        edges of its longitude band, which beats a dense points x vertices
+        ray cast at any batch size.
+        """
+        return [self.contains(lat, lon) for lat, lon in points]
+
+
+class AlertModel:
+    """
+    Compiled view of one coordinator snapshot. Built once per update so the
+    entities never re-split circle or polygon strings on a state write.
+    """
+
+    __slots__ = (
+        "generation", "burgernet", "nl_alert", "nl_alert_index",
+        "national", "circles", "circle_index",
+    )
+
+    def __init__(self, burgernet, nl_alert, generation=0):
+        self.generation = generation
+        self.burgernet = burgernet
+        self.nl_alert = nl_alert
+        self.nl_alert_index = GridIndex(nl_alert)
+        # National alerts match everywhere; the rest are geofenced circles
+        self.national = [compiled for compiled in burgernet if compiled.national]
+        self.circles = [
+            compiled for compiled in burgernet
+            if not compiled.national and compiled.radius_m is not None
+        ]
+        self.circle_index = GridIndex(self.circles)
+
+    def match_burgernet(self, lat, lon, max_radius_m):
+        """Return the highest ranked Burgernet alert at (lat, lon), or None."""
+        ranked = self.rank_burgernet(lat, lon, max_radius_m)
+        return ranked[0] if ranked else None
+
+    def rank_burgernet(self, lat, lon, max_radius_m):
+        """
+        Return every Burgernet alert applying at (lat, lon) as a tuple:
+        national alerts first, then circles by distance, higher level first
+        on ties.
+        """
+        lat_rad = math.radians(lat)
+        lon_rad = math.radians(lon)
+        cos_lat = math.cos(lat_rad)
+        national = sorted(
+            (-compiled.level, idx) for idx, compiled in enumerate(self.national)
+        )
+        found = []
+        for idx in self.circle_index.candidates(lat, lon):
+            compiled = self.circles[idx]
+            limit = min(compiled.radius_m, max_radius_m)
+            if compiled.rejects(lat, lon, cos_lat, limit):
+                continue
+            distance = compiled.distance_m(lat_rad, lon_rad, cos_lat)
+            if distance <= limit:
+                found.append((distance, -compiled.level, idx))
+        found.sort()
+        return tuple(
+            [self.national[idx].alert for _, idx in national]
+            + [self.circles[idx].alert for _, _, idx in found]
+        )
+
+    def match_nl_alert(self, lat, lon):
+        """Return the first active NL-Alert item whose polygon contains (lat, lon)."""
+        for idx in self.nl_alert_index.candidates(lat, lon):
+            polygon = self.nl_alert[idx]
+            if polygon.contains(lat, lon):
+                return polygon.item
+        return None
+
+    def safe_radius(self, lat, lon, max_radius_m):
+        """
+        Distance in meters from (lat, lon) to the nearest boundary where the
+        verdict could change: a Burgernet circle edge (clipped to
+        `max_radius_m`) or an active NL-Alert polygon edge. Any point closer
+        than this to (lat, lon) gets the same result.
+        """
+        best = SAFE_RADIUS_MAX_M
+        lat_rad = math.radians(lat)
+        lon_rad = math.radians(lon)
+        cos_lat = math.cos(lat_rad)
+        # A circle's edge lies within its bounding box, so only circles in
+        # cells within reach need a look, and boxes at `best` or further
+        # need no haversine
+        for idx in self.circle_index.near(lat, lon, best):
+            compiled = self.circles[idx]
+            if bbox_distance(
+                lat, lon,
+                compiled.min_lat, compiled.max_lat, compiled.min_lon, compiled.max_lon,
+            ) >= best:
+                continue
+            edge = min(compiled.radius_m, max_radius_m)
+            best = min(best, abs(compiled.distance_m(lat_rad, lon_rad, cos_lat) - edge))
+
+        for idx in self.nl_alert_index.near(lat, lon, best):
+            polygon = self.nl_alert[idx]
+            if bbox_distance(
+                lat, lon,
+                polygon.min_lat, polygon.max_lat, polygon.min_lon, polygon.max_lon,
+            ) >= best:
+                continue
+            best = min(best, polygon_edge_distance(lat, lon, polygon.lats, polygon.lons))
+
+        return best * SAFE_RADIUS_FACTOR
+
+    def match_many(self, points, max_radius_m):
+        """
+        Evaluate several (lat, lon) points in one pass over the alert set.
+        Returns a list of (burgernet_alerts, nl_alert_item) per point, with
+        the ranking of `rank_burgernet` and the first-match semantics of
+        `match_nl_alert`.
+        """
+        return list(zip(
+            self._match_burgernet_many(points, max_radius_m),
+            self._match_nl_alert_many(points),
+        ))
+
+    def _match_burgernet_many(self, points, max_radius_m):
+        # The circle index leaves a handful of candidates per point, which
+        # beats a dense points x circles distance matrix
+        return [self.rank_burgernet(lat, lon, max_radius_m) for lat, lon in points]
+
+    def _match_nl_alert_many(self, points):
+        # Group points by candidate polygon so each polygon is visited once
+        pending = {}
+        for i, (lat, lon) in enumerate(points):
+            for idx in self.nl_alert_index.candidates(lat, lon):
+                pending.setdefault(idx, []).append(i)
+
+        results = [None] * len(points)
+        # Feed order, so the first containing item wins as in `match_nl_alert`
+        for idx in sorted(pending):
+            todo = [i for i in pending[idx] if results[i] is None]
+            if not todo:
+                continue
+            polygon = self.nl_alert[idx]
+            inside = polygon.contains_many([points[i] for i in todo])
+            for i, hit in zip(todo, inside):
+                if hit:
+                    results[i] = polygon.item
+        return results
+
+
+class ResultCache:
+    """
+    Memoized verdicts keyed on (model generation, quantized lat/lon, radius).
+    Entries are dropped only when a model of a new generation is evaluated,
+    so a static location costs no geometry until new data arrives.
+    """
+
+    __slots__ = ("generation", "max_entries", "hits", "misses", "_entries")
+
+    def __init__(self, max_entries=256):
+        self.generation = None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+
+    def hit_rate(self):
+        """Share of cached verdicts in percent, or None before any lookup."""
+        total = self.hits + self.misses
+        return round(100 * self.hits / total, 1) if total else None
+
+    def as_dict(self):
+        """Counters, for diagnostics."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "entries": len(self._entries),
+        }
+
+    def evaluate(self, model, points, max_radius_m):
+        """Same as `model.match_many`, reusing cached verdicts where possible."""
+        if model.generation != self.generation:
+            self._entries.clear()
+            self.generation = model.generation
+
+        keys = [
+            (
+                round(lat, LOCATION_PRECISION),
+                round(lon, LOCATION_PRECISION),
+                max_radius_m,
+            )
+            for lat, lon in points
+        ]
+        results = [self._entries.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            fresh = model.match_many([points[i] for i in missing], max_radius_m)
+            for i, result in zip(missing, fresh):
+                results[i] = result
+                # Moving trackers create new keys; evict the oldest first
+                if len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+                self._entries[keys[i]] = result
+
+        return results
+
+
+class SafeZone:
+    """A verdict together with the radius around its location where it holds."""
+
+    __slots__ = ("generation", "lat", "lon", "radius_m", "result")
+
+    def __init__(self, generation, lat, lon, radius_m, result):
+        self.generation = generation
+        self.lat = lat
+        self.lon = lon
+        self.radius_m = radius_m
+        self.result = result
+
+    def covers(self, generation, lat, lon, accuracy_m=0):
+        """True if (lat, lon) ± `accuracy_m` stays inside this zone's radius."""
+        return (
+            generation == self.generation
+            and haversine(self.lat, self.lon, lat, lon) + accuracy_m <= self.radius_m
+        )
+
+
+def parse_circle(circle):
+    """Parse a Burgernet `"lat,lon radius_m"` string into (lat, lon, radius_m)."""
+    centre_str, radius_str = circle.split()
+    clat, clon = [float(x) for x in centre_str.split(",")]
+    return clat, clon, float(radius_str)
+
+
+def parse_polygon(poly_str):
+    """Parse `"52.40124,4.86918 52.40224,4.83122 …"` into (lats, lons) arrays."""
+    lats = array("d")
+    lons = array("d")
+    for pair in poly_str.strip().split():
+        lat_str, lon_str = pair.split(",")
+        lats.append(float(lat_str))
+        lons.append(float(lon_str))
+    return lats, lons
+
+
+class CompiledFeed:
+    """
+    Compiled alerts of one source keyed by alert id, in feed order, plus the
+    diff against the previous snapshot. Unchanged alerts reuse their
+    previously compiled geometry.
+    """
+
+    __slots__ = ("entries", "added", "changed", "removed", "initial")
+
+    def __init__(self, initial):
+        # key -> (raw item, [compiled geometry])
+        self.entries = {}
+        self.added = []
+        self.changed = []
+        # key -> (raw item, [compiled geometry]) of alerts that disappeared
+        self.removed = {}
+        # True when there was no previous snapshot to diff against
+        self.initial = initial
+
+    def __len__(self):
+        return len(self.entries)
+
+    def same_as(self, previous):
+        """True if nothing was added, changed, removed or reordered."""
+        return (
+            not (self.added or self.changed or self.removed)
+            and list(self.entries) == list(previous.entries)
+        )
+
+    def alerts(self):
+        """All compiled geometry, in feed order."""
+        return [c for _, compiled in self.entries.values() for c in compiled]
+
+
+def compile_feed(items, previous, key_field, compile_item):
+    """
+    Compile `items` keyed by `key_field`, recompiling only alerts that are
+    new or whose raw item changed since the `previous` CompiledFeed.
+    """
+    feed = CompiledFeed(initial=previous is None)
+    old = previous.entries if previous is not None else {}
+    for position, item in enumerate(items):
+        key = item.get(key_field)
+        if key is None or key in feed.entries:
+            key = f"#{position}"
+        prior = old.get(key)
+        if prior is not None and prior[0] == item:
+            feed.entries[key] = prior
+            continue
+        feed.entries[key] = (item, compile_item(item))
+        (feed.changed if prior is not None else feed.added).append(key)
+    feed.removed = {
+        key: entry for key, entry in old.items() if key not in feed.entries
+    }
+    return feed
+
+
+def _compile_burgernet_alert(alert):
+    """Compile one Burgernet alert; empty if it can never match a location."""
+    try:
+        level = int(alert.get("AlertLevel", 0))
+    except (TypeError, ValueError):
+        _LOGGER.debug("Skipping Burgernet alert with bad level %r", alert.get("AlertLevel"))
+        return []
+    circle = (alert.get("Area") or {}).get("Circle")
+    if level != 10 and not circle:
+        return []
+    try:
+        parsed = parse_circle(circle) if circle else None
+    except ValueError:
+        _LOGGER.debug("Skipping Burgernet alert with bad circle %r", circle)
+        return []
+    return [BurgernetAlert(alert, level, parsed)]
+
+
+def _compile_nl_alert_item(item):
+    """Compile the `area` polygons of one NL-Alert item."""
+    compiled = []
+    for poly_str in item.get("area", []):
+        try:
+            lats, lons = parse_polygon(poly_str)
+        except ValueError:
+            _LOGGER.debug("Skipping bad polygon in NL-Alert %s", item.get("id"))
+            continue
+        if lats:
+            compiled.append(NLAlertPolygon(item, lats, lons))
+    return compiled
+
+
+def compile_burgernet(alerts, previous=None):
+    """Compile the raw Burgernet list into a CompiledFeed keyed by AlertId."""
+    return compile_feed(alerts or [], previous, "AlertId", _compile_burgernet_alert)
+
+
+def compile_nl_alert(payload, previous=None):
+    """Compile active NL-Alert items (stop_at == None) into a CompiledFeed keyed by id."""
+    active = [
+        item for item in (payload or {}).get("data", [])
+        if item.get("stop_at") is None
+    ]
+    return compile_feed(active, previous, "id", _compile_nl_alert_item)
+
+
+def compile_alerts(data, generation=0):
+    """Build an `AlertModel` from a coordinator payload dict."""
+    return AlertModel(
+        compile_burgernet(data.get("burgernet")).alerts(),
+        compile_nl_alert(data.get("nl_alert")).alerts(),
+        generation,
+    )
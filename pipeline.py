@@ -0,0 +1,246 @@
+# custom_components/nl_alert/pipeline.py
+
+import asyncio
+import hashlib
+import logging
+import time
+
+import aiohttp
+import async_timeout
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .decode import decode_json
+from .scheduler import parse_retry_after
+from .stats import SourceStats, elapsed_ms
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RetryLater(Exception):
+    """An API answered 429/503, optionally telling us when to come back."""
+
+    def __init__(self, source, status, retry_after):
+        super().__init__(f"{source} answered HTTP {status}")
+        self.retry_after = retry_after
+
+
+class SourcePipeline:
+    """
+    Fetch, decode and compile one upstream feed on its own schedule.
+
+    Each pipeline has its own timeout, poll scheduler, conditional request
+    validators and last-good payload, so a slow or failing source never
+    delays or invalidates the other one. The event loop only does the I/O:
+    bodies of `inline_limit` bytes or more are decoded and compiled in the
+    executor, and the finished result is swapped in.
+    """
+
+    def __init__(
+        self,
+        hass,
+        source,
+        url,
+        timeout,
+        scheduler,
+        compile_fn,
+        decode_fn=decode_json,
+        inline_limit=0,
+    ):
+        self.hass = hass
+        self.source = source
+        self.url = url
+        self.timeout = timeout
+        self.scheduler = scheduler
+        self.inline_limit = inline_limit
+        # Both run off the event loop for large bodies; they must be pure
+        self._compile_fn = compile_fn
+        self._decode_fn = decode_fn
+        self._validators = {}
+        # Digest of the last processed body, to skip identical 200 responses
+        self._digest = None
+
+        # Last good decoded payload and its compiled form
+        self.payload = None
+        self.compiled = None
+        self.fetched_at = None
+        self.last_error = None
+        self.next_due = None
+        # When this source was last requested upstream, successful or not
+        self.requested_at = None
+        self.stats = SourceStats()
+        # Fetch in progress, so overlapping refresh cycles never request
+        # this source twice
+        self._inflight = None
+
+    @property
+    def in_flight(self):
+        """True while a fetch of this source is under way."""
+        return self._inflight is not None
+
+    def due(self, now):
+        """True if this source should be fetched at `now`."""
+        return self.next_due is None or now >= self.next_due
+
+    async def async_refresh(self, session):
+        """
+        Fetch this source once and schedule its next poll. Errors are logged
+        and keep the last good data. Returns True if the payload changed.
+        A call made while a fetch is under way waits for that fetch instead
+        of starting another, and returns False: the change is reported once,
+        to the caller that started it.
+        """
+        if self._inflight is not None:
+            await self.async_wait()
+            return False
+        self._inflight = self.hass.async_create_task(
+            self._async_refresh(session), f"nl_alert {self.source} refresh"
+        )
+        self._inflight.add_done_callback(self._clear_inflight)
+        return await asyncio.shield(self._inflight)
+
+    async def async_wait(self):
+        """Wait for the fetch under way, if any, without cancelling it."""
+        if self._inflight is not None:
+            await asyncio.wait((self._inflight,))
+
+    @callback
+    def async_cancel(self):
+        """Cancel the fetch under way, if any."""
+        if self._inflight is not None:
+            self._inflight.cancel()
+
+    @callback
+    def _clear_inflight(self, task):
+        self._inflight = None
+
+    async def _async_refresh(self, session):
+        changed = False
+        self.requested_at = dt_util.utcnow()
+        self.stats.requests += 1
+        start = time.perf_counter()
+        try:
+            async with async_timeout.timeout(self.timeout):
+                raw, validators = await self._async_fetch(session)
+            self.stats.fetch_ms = elapsed_ms(start)
+            if raw is not None:
+                changed = await self._async_process(raw)
+                # Only a body that decoded and compiled may be revalidated;
+                # a 304 for a rejected one would pass off stale data as fresh
+                self._validators = validators
+        except RetryLater as err:
+            self.stats.errors += 1
+            self.last_error = err
+            interval = self.scheduler.on_failure(err.retry_after)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as err:
+            self.stats.errors += 1
+            self.last_error = err
+            interval = self.scheduler.on_failure()
+        else:
+            self.last_error = None
+            self.fetched_at = dt_util.utcnow()
+            interval = self.scheduler.on_success(
+                active=bool(self.compiled), changed=changed
+            )
+
+        if self.last_error is not None:
+            _LOGGER.warning(
+                "Fetching %s failed (%r); keeping last good data, retrying in %s",
+                self.source, self.last_error, interval,
+            )
+        self.next_due = dt_util.utcnow() + interval
+        return changed
+
+    def as_dict(self):
+        """Last good payload, its fetch time and validators, for persisting."""
+        return {
+            "payload": self.payload,
+            "fetched_at": self.fetched_at.isoformat() if self.fetched_at else None,
+            "validators": self._validators,
+        }
+
+    async def async_restore(self, stored):
+        """Adopt a payload persisted by `as_dict`, compiling it in the executor."""
+        self.compiled = await self.hass.async_add_executor_job(
+            self._compile_fn, stored["payload"], None
+        )
+        self.payload = stored["payload"]
+        self.fetched_at = dt_util.parse_datetime(stored.get("fetched_at") or "")
+        self._validators = stored.get("validators") or {}
+
+    def _process(self, raw, previous):
+        """
+        Decode and compile a response body, diffing against the `previous`
+        compiled feed. Runs inline or in the executor. Returns the payload,
+        the compiled feed and the decode and compile times in ms.
+        """
+        start = time.perf_counter()
+        payload = self._decode_fn(raw)
+        decode_ms = elapsed_ms(start)
+        start = time.perf_counter()
+        try:
+            compiled = self._compile_fn(payload, previous)
+        except (AttributeError, KeyError, TypeError) as err:
+            # Valid JSON of the wrong shape, e.g. an object instead of a list
+            raise ValueError(f"Unexpected {self.source} payload: {err!r}") from err
+        return payload, compiled, decode_ms, elapsed_ms(start)
+
+    async def _async_process(self, raw):
+        """Process a new body unless it is identical to the last one."""
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if digest == self._digest and self.payload is not None:
+            self.stats.unchanged += 1
+            return False
+
+        if len(raw) < self.inline_limit:
+            result = self._process(raw, self.compiled)
+        else:
+            result = await self.hass.async_add_executor_job(
+                self._process, raw, self.compiled
+            )
+        payload, compiled, self.stats.decode_ms, self.stats.compile_ms = result
+
+        self._digest = digest
+        if self.compiled is not None and compiled.same_as(self.compiled):
+            # New bytes, same alerts (e.g. a timestamp field moved on)
+            self.stats.unchanged += 1
+            return False
+        self.payload = payload
+        self.compiled = compiled
+        return True
+
+    async def _async_fetch(self, session):
+        """
+        GET the feed with ETag / If-Modified-Since validators from the last
+        poll. Returns the raw body and the validators for the next poll, or
+        (None, None) on 304 Not Modified.
+        """
+        headers = {"Accept": "application/json"}
+        if self.payload is not None:
+            headers.update(self._validators)
+
+        async with session.get(self.url, headers=headers) as resp:
+            self.stats.last_status = resp.status
+            if resp.status == 304 and self.payload is not None:
+                _LOGGER.debug("%s not modified; reusing previous payload", self.source)
+                self.stats.not_modified += 1
+                self.stats.last_bytes = 0
+                return None, None
+
+            if resp.status in (429, 503):
+                raise RetryLater(
+                    self.source,
+                    resp.status,
+                    parse_retry_after(resp.headers.get("Retry-After")),
+                )
+            resp.raise_for_status()
+            raw = await resp.read()
+            self.stats.last_bytes = len(raw)
+
+            validators = {}
+            if resp.headers.get("ETag"):
+                validators["If-None-Match"] = resp.headers["ETag"]
+            if resp.headers.get("Last-Modified"):
+                validators["If-Modified-Since"] = resp.headers["Last-Modified"]
+        return raw, validators
@@ -0,0 +1,70 @@
+# custom_components/nl_alert/scheduler.py
+
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+# Spread polls of many instances by up to ±10%
+JITTER = 0.1
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class PollScheduler:
+    """
+    Adaptive poll interval between `min_interval` and `max_interval`.
+
+    While alerts are active or the feed just changed, poll at the minimum.
+    Each quiet poll doubles the interval up to the maximum. Failures back
+    off exponentially from the minimum, and a server's Retry-After is never
+    undercut. Every interval gets a little jitter.
+    """
+
+    __slots__ = ("min_interval", "max_interval", "_quiet", "_failures")
+
+    def __init__(self, min_interval, max_interval):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self._quiet = 0
+        self._failures = 0
+
+    def _backoff(self, steps):
+        seconds = self.min_interval.total_seconds() * (2 ** min(steps, 16))
+        return min(seconds, self.max_interval.total_seconds())
+
+    @staticmethod
+    def _jitter(seconds):
+        return timedelta(seconds=seconds * random.uniform(1 - JITTER, 1 + JITTER))
+
+    def on_success(self, active, changed):
+        """Return the next interval after a successful poll."""
+        self._failures = 0
+        if active or changed:
+            self._quiet = 0
+        else:
+            self._quiet += 1
+        return self._jitter(self._backoff(self._quiet))
+
+    def on_failure(self, retry_after=None):
+        """Return the next interval after a failed or rate-limited poll."""
+        self._failures += 1
+        seconds = self._backoff(self._failures - 1)
+        if retry_after is not None and retry_after > seconds:
+            # Only jitter upwards so the server's deadline is respected
+            return timedelta(seconds=retry_after * random.uniform(1, 1 + JITTER))
+        return self._jitter(seconds)
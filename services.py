@@ -0,0 +1,156 @@
+# custom_components/nl_alert/services.py
+
+from datetime import datetime, timezone
+
+import voluptuous as vol
+
+from homeassistant.core import ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, DATA_HUB
+from .entity import alert_attributes
+
+SERVICE_GET_ALERT_DETAILS = "get_alert_details"
+SERVICE_QUERY_HISTORY = "query_history"
+SERVICE_REFRESH = "refresh"
+
+GET_ALERT_DETAILS_SCHEMA = vol.Schema({
+    vol.Optional("entry_id"): str,
+})
+
+REFRESH_SCHEMA = vol.Schema({
+    vol.Optional("entry_id"): str,
+})
+
+QUERY_HISTORY_SCHEMA = vol.Schema({
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+    vol.Optional("latitude"): cv.latitude,
+    vol.Optional("longitude"): cv.longitude,
+    vol.Optional("distance"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional("source"): vol.In(["burgernet", "nl_alert"]),
+    vol.Optional("matched_only", default=False): cv.boolean,
+})
+
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def entry_coordinators(hass, entry_id=None):
+    """Return the per-entry coordinators, optionally only the one of `entry_id`."""
+    return [
+        coordinator
+        for key, coordinator in hass.data.get(DOMAIN, {}).items()
+        if key != DATA_HUB and entry_id in (None, key)
+    ]
+
+
+@callback
+def async_setup_services(hass):
+    """Register the integration's services."""
+
+    async def _async_get_alert_details(call: ServiceCall):
+        """Full details of the alerts currently matching each location."""
+        locations = []
+        for coordinator in entry_coordinators(hass, call.data.get("entry_id")):
+            results = (coordinator.data or {}).get("results", {})
+            for tracker in coordinator.trackers:
+                burgernet_alerts, nl_item = results.get(tracker, ((), None))
+                locations.append({
+                    "entry_id": coordinator.entry.entry_id,
+                    "tracker": tracker,
+                    **alert_attributes(burgernet_alerts, nl_item),
+                })
+        return {"locations": locations}
+
+    async def _async_refresh(call: ServiceCall):
+        """Fetch fresh data (rate limited) and return the verdict per location."""
+        hub = hass.data.get(DOMAIN, {}).get(DATA_HUB)
+        if hub is None:
+            raise ServiceValidationError("NL-Alert is not set up")
+
+        fetched = await hub.async_refresh_now()
+        coordinators = entry_coordinators(hass, call.data.get("entry_id"))
+        # Pick up tracker moves still waiting in the debounce window
+        for coordinator in coordinators:
+            await coordinator.async_reevaluate()
+        if not call.return_response:
+            return None
+
+        locations = []
+        for coordinator in coordinators:
+            results = (coordinator.data or {}).get("results", {})
+            for tracker in coordinator.trackers:
+                burgernet_alerts, nl_item = results.get(tracker, ((), None))
+                locations.append({
+                    "entry_id": coordinator.entry.entry_id,
+                    "tracker": tracker,
+                    "active": bool(burgernet_alerts or nl_item),
+                    **alert_attributes(burgernet_alerts, nl_item, compact=True),
+                })
+        return {
+            "fetched": fetched,
+            "sources": {
+                source: {
+                    "fetched_at": pipeline.fetched_at.isoformat() if pipeline.fetched_at else None,
+                    "error": repr(pipeline.last_error) if pipeline.last_error else None,
+                }
+                for source, pipeline in hub.pipelines.items()
+            },
+            "locations": locations,
+        }
+
+    async def _async_query_history(call: ServiceCall):
+        """Alerts seen in a time range, optionally near a location."""
+        hub = hass.data.get(DOMAIN, {}).get(DATA_HUB)
+        if hub is None:
+            raise ServiceValidationError("NL-Alert is not set up")
+
+        lat = call.data.get("latitude")
+        lon = call.data.get("longitude")
+        if (lat is None) != (lon is None):
+            raise ServiceValidationError("Give both latitude and longitude, or neither")
+        if lat is None and "distance" in call.data:
+            lat, lon = hass.config.latitude, hass.config.longitude
+
+        start = call.data.get("start")
+        end = call.data.get("end")
+        distance = call.data.get("distance")
+        alerts = hub.history.query(
+            start=dt_util.as_timestamp(start) if start else None,
+            end=dt_util.as_timestamp(end) if end else None,
+            lat=lat,
+            lon=lon,
+            max_distance_m=distance * 1000 if distance is not None else None,
+            source=call.data.get("source"),
+            matched_only=call.data["matched_only"],
+        )
+        for alert in alerts:
+            alert["first_seen"] = _isoformat(alert["first_seen"])
+            alert["last_seen"] = _isoformat(alert["last_seen"])
+        return {"alerts": alerts}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_ALERT_DETAILS,
+        _async_get_alert_details,
+        schema=GET_ALERT_DETAILS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH,
+        _async_refresh,
+        schema=REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_HISTORY,
+        _async_query_history,
+        schema=QUERY_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,41 @@
+# custom_components/nl_alert/stats.py
+
+import time
+
+
+def elapsed_ms(start):
+    """Milliseconds since a `time.perf_counter()` reading."""
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+class SourceStats:
+    """Counters and last-poll timings of one upstream source."""
+
+    __slots__ = (
+        "requests", "not_modified", "unchanged", "errors",
+        "last_status", "last_bytes", "fetch_ms", "decode_ms", "compile_ms",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        # 304 responses, and 200 responses with the same body or alerts
+        self.not_modified = 0
+        self.unchanged = 0
+        self.errors = 0
+        self.last_status = None
+        self.last_bytes = None
+        self.fetch_ms = None
+        self.decode_ms = None
+        self.compile_ms = None
+
+    def as_dict(self):
+        """All counters and timings, for diagnostics."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def summary(self):
+        """One-line timing breakdown, for slow-cycle logging."""
+        return (
+            f"HTTP {self.last_status}, {self.last_bytes} bytes, "
+            f"fetch {self.fetch_ms} ms, decode {self.decode_ms} ms, "
+            f"compile {self.compile_ms} ms"
+        )
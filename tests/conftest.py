@@ -0,0 +1,17 @@
+# custom_components/nl_alert/tests/conftest.py
+
+"""
+The pure-Python modules (geometry, model, decode, history) are tested
+without Home Assistant: the integration directory is registered as the
+`nl_alert` package without running its `__init__.py`, as the benchmarks do.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from common import register_package  # noqa: E402
+
+register_package()
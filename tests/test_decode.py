@@ -0,0 +1,76 @@
+# custom_components/nl_alert/tests/test_decode.py
+
+import json
+import random
+
+import pytest
+
+from nl_alert import decode
+from nl_alert.decode import ItemStream, decode_nl_alert
+
+PAYLOAD = {
+    "meta": {"count": 3, "tags": ["a", "[b]"]},
+    "data": [
+        {"id": "1", "stop_at": None, "message": 'quote " and brace } inside', "area": ["52,5 52,6 53,6"]},
+        {"id": "2", "stop_at": "2024-01-01T00:00:00Z", "area": ["52,5 52,6 53,6"]},
+        {"id": "3", "stop_at": None, "message": "nested [ { ", "area": []},
+    ],
+}
+
+
+def test_decode_keeps_active_items():
+    raw = json.dumps(PAYLOAD).encode()
+    assert decode_nl_alert(raw) == {
+        "data": [item for item in PAYLOAD["data"] if item["stop_at"] is None]
+    }
+
+
+def test_expired_items_are_not_decoded(monkeypatch):
+    decoded = []
+
+    def loads(text):
+        decoded.append(text)
+        return json.loads(text)
+
+    monkeypatch.setattr(decode, "_loads", loads)
+    raw = (
+        b'{"data": ['
+        b'{"id": "1", "stop_at": "2024-01-01T00:00:00Z", "area": ["52,5 52,6 53,6"]},'
+        b'{"id": "2", "message": "stop_at", "stop_at" :\n null, "area": []},'
+        b'{"id": "3", "area": [], "stop_at": 0},'
+        b'{"id": "4", "meta": {"stop_at": "nested"}, "stop_at": null}'
+        b']}'
+    )
+    assert [item["id"] for item in decode_nl_alert(raw)["data"]] == ["2", "4"]
+    assert not any('"id": "1"' in text or '"id": "3"' in text for text in decoded)
+
+
+def test_random_chunking_matches_whole_decode():
+    raw = json.dumps(PAYLOAD, ensure_ascii=False).encode()
+    rng = random.Random(0)
+    for _ in range(50):
+        stream = ItemStream(lambda item: item.get("stop_at") is None, drop_if_set="stop_at")
+        pos = 0
+        while pos < len(raw):
+            step = rng.randint(1, 16)
+            stream.feed(raw[pos:pos + step])
+            pos += step
+        stream.close()
+        assert [item["id"] for item in stream.items] == ["1", "3"]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b"",
+        b"<html><body>Service unavailable</body></html>",
+        b'<html><a href="x">{"data": [</a></html>',
+        b'{"meta": {}}',
+        b'[{"id": "1", "stop_at": null}]',
+        json.dumps(PAYLOAD).encode()[:-20],
+        json.dumps(PAYLOAD).encode() + b"]}",
+    ],
+)
+def test_incomplete_or_foreign_documents_raise(raw):
+    with pytest.raises(ValueError):
+        decode_nl_alert(raw)
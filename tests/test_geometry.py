@@ -0,0 +1,110 @@
+# custom_components/nl_alert/tests/test_geometry.py
+
+"""
+The vectorized and indexed geometry must agree with the scalar reference
+functions, with NumPy and with the pure-Python fallback.
+"""
+
+import math
+import random
+from array import array
+
+import pytest
+
+from nl_alert import geometry
+from nl_alert.geometry import (
+    EdgeTable,
+    batch_haversine,
+    batch_point_in_polygon,
+    haversine,
+    point_in_polygon,
+    point_in_polygon_arrays,
+    polygon_edge_distance,
+)
+
+NUMPY = geometry.np
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Run a test once with NumPy (when installed) and once without."""
+    if request.param == "numpy":
+        if NUMPY is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(geometry, "np", None)
+    return request.param
+
+
+def _polygon(rng, vertices):
+    """A star-shaped, non-convex polygon around a random centre in NL."""
+    lat0, lon0 = rng.uniform(51, 53), rng.uniform(4, 6)
+    lats, lons = array("d"), array("d")
+    for k in range(vertices):
+        angle = 2 * math.pi * k / vertices
+        r = rng.uniform(0.05, 0.3)
+        lats.append(lat0 + r * math.sin(angle))
+        lons.append(lon0 + r * math.cos(angle))
+    return lats, lons
+
+
+def _points(rng, lats, lons, count):
+    """Random points over the polygon's bounding box, plus a margin."""
+    return [
+        (
+            rng.uniform(min(lats) - 0.05, max(lats) + 0.05),
+            rng.uniform(min(lons) - 0.05, max(lons) + 0.05),
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("vertices", [3, 10, 100, 1000])
+def test_polygon_representations_agree(vertices):
+    rng = random.Random(vertices)
+    for _ in range(5):
+        lats, lons = _polygon(rng, vertices)
+        ring = list(zip(lats, lons))
+        edges = EdgeTable(lats, lons)
+        points = _points(rng, lats, lons, 200)
+        expected = [point_in_polygon(lat, lon, ring) for lat, lon in points]
+        assert any(expected) and not all(expected)
+        assert [point_in_polygon_arrays(lat, lon, lats, lons) for lat, lon in points] == expected
+        assert [edges.contains(lat, lon) for lat, lon in points] == expected
+
+
+@pytest.mark.parametrize("vertices", [3, 50, 2000])
+def test_batch_point_in_polygon_matches_scalar(backend, vertices):
+    rng = random.Random(vertices)
+    lats, lons = _polygon(rng, vertices)
+    ring = list(zip(lats, lons))
+    points = _points(rng, lats, lons, 300)
+    result = batch_point_in_polygon(points, lats, lons)
+    assert [bool(hit) for hit in result] == [
+        point_in_polygon(lat, lon, ring) for lat, lon in points
+    ]
+
+
+def test_batch_haversine_matches_scalar(backend):
+    rng = random.Random(1)
+    points = [(rng.uniform(50.7, 53.6), rng.uniform(3.3, 7.3)) for _ in range(40)]
+    centres = [(rng.uniform(50.7, 53.6), rng.uniform(3.3, 7.3)) for _ in range(25)]
+    result = batch_haversine(points, centres)
+    for i, (lat, lon) in enumerate(points):
+        for j, (clat, clon) in enumerate(centres):
+            assert float(result[i][j]) == pytest.approx(
+                haversine(lat, lon, clat, clon), rel=1e-9, abs=1e-6
+            )
+
+
+@pytest.mark.parametrize("vertices", [10, 500])
+def test_polygon_edge_distance_backends_agree(vertices, monkeypatch):
+    if NUMPY is None:
+        pytest.skip("NumPy is not installed")
+    rng = random.Random(vertices)
+    lats, lons = _polygon(rng, vertices)
+    points = _points(rng, lats, lons, 50)
+    with_numpy = [polygon_edge_distance(lat, lon, lats, lons) for lat, lon in points]
+    monkeypatch.setattr(geometry, "np", None)
+    without = [polygon_edge_distance(lat, lon, lats, lons) for lat, lon in points]
+    assert with_numpy == pytest.approx(without, rel=1e-9, abs=1e-6)
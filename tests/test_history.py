@@ -0,0 +1,85 @@
+# custom_components/nl_alert/tests/test_history.py
+
+from nl_alert.history import AlertHistory
+from nl_alert.model import compile_burgernet
+
+
+def _alert(alert_id, lat=52.0, lon=5.0, radius=5000):
+    return {
+        "AlertId": alert_id,
+        "AlertLevel": 1,
+        "Message": {"Title": f"Alert {alert_id}"},
+        "Area": {"Circle": f"{lat},{lon} {radius}"},
+    }
+
+
+def _feed(ids, previous=None):
+    return compile_burgernet([_alert(i) for i in ids], previous)
+
+
+def test_record_opens_and_closes_alerts():
+    history = AlertHistory(100, 30)
+    first = _feed([1, 2])
+    history.record("burgernet", first, now=1000)
+    history.record("burgernet", _feed([2, 3], first), now=2000)
+
+    entries = {e["alert_id"]: e for e in history.query(now=3000)}
+    assert set(entries) == {1, 2, 3}
+    assert entries[1]["active"] is False
+    assert entries[1]["last_seen"] == 2000
+    assert entries[2]["first_seen"] == 1000
+    assert entries[2]["last_seen"] == 3000  # still active
+    assert entries[1]["circle"] == [52.0, 5.0, 5000.0]
+
+
+def test_size_cap_evicts_ended_alerts_first():
+    # Float caps, as stored by the options flow's number selectors
+    history = AlertHistory(3.0, 30)
+    feed = _feed([1, 2, 3])
+    history.record("burgernet", feed, now=1000)
+    feed = _feed([3, 4], feed)  # 1 and 2 end
+    history.record("burgernet", feed, now=2000)
+
+    assert len(history) == 3
+    assert {e["alert_id"] for e in history.query(now=2000)} == {2, 3, 4}
+
+    feed = _feed([3, 4, 5, 6], feed)
+    history.record("burgernet", feed, now=3000)
+    # Ended alert 2 goes before any active one, then the least recently updated
+    assert len(history) == 3
+    assert {e["alert_id"] for e in history.query(now=3000)} == {4, 5, 6}
+
+
+def test_age_cap_drops_old_ended_alerts():
+    history = AlertHistory(100, 1)
+    feed = _feed([1, 2])
+    history.record("burgernet", feed, now=0)
+    feed = _feed([2], feed)
+    history.record("burgernet", feed, now=10)
+    history.record("burgernet", _feed([2, 3], feed), now=10 + 86400 + 1)
+
+    assert {e["alert_id"] for e in history.query()} == {2, 3}
+
+
+def test_persisted_entries_round_trip_and_apply_caps():
+    history = AlertHistory(100, 30)
+    history.record("burgernet", _feed(range(10)), now=1000)
+
+    restored = AlertHistory(4, 30)
+    restored.load(history.as_list(), now=1000)
+    assert len(restored) == 4
+    assert [e["alert_id"] for e in restored.query(now=1000)] == [6, 7, 8, 9]
+
+
+def test_query_time_range_and_distance():
+    history = AlertHistory(100, 30)
+    feed = compile_burgernet([_alert(1), _alert(2, lat=53.0, lon=6.0)])
+    history.record("burgernet", feed, now=1000)
+    history.record("burgernet", compile_burgernet([_alert(2, lat=53.0, lon=6.0)], feed), now=2000)
+    history.mark_matched("burgernet", 2)
+
+    assert [e["alert_id"] for e in history.query(start=2500, now=3000)] == [2]
+    assert [e["alert_id"] for e in history.query(end=500, now=3000)] == []
+    near = history.query(lat=52.0, lon=5.0, max_distance_m=10000, now=3000)
+    assert [(e["alert_id"], e["distance_m"]) for e in near] == [(1, 0)]
+    assert [e["alert_id"] for e in history.query(matched_only=True)] == [2]
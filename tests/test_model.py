@@ -0,0 +1,68 @@
+# custom_components/nl_alert/tests/test_model.py
+
+import math
+import random
+
+from nl_alert.geometry import M_PER_DEG, haversine
+from nl_alert.model import AlertModel, compile_burgernet, compile_nl_alert
+
+
+def test_alert_with_bad_level_is_skipped():
+    alerts = [
+        {"AlertId": 1, "AlertLevel": None, "Area": {"Circle": "52.0,5.0 5000"}},
+        {"AlertId": 2, "AlertLevel": "high", "Area": {"Circle": "52.0,5.0 5000"}},
+        {"AlertId": 3, "AlertLevel": 2, "Area": {"Circle": "52.0,5.0 5000"}},
+    ]
+    feed = compile_burgernet(alerts)
+    assert feed.entries[1][1] == []
+    assert feed.entries[2][1] == []
+    assert [alert.level for alert in feed.entries[3][1]] == [2]
+
+
+def _model(rng):
+    alerts = []
+    for i in range(400):
+        lat, lon = rng.uniform(51.8, 52.4), rng.uniform(4.6, 5.6)
+        radius = rng.choice((500, 1000, 2500, 5000, 10000))
+        alerts.append({
+            "AlertId": i,
+            "AlertLevel": rng.choice((1, 2, 3)),
+            "Area": {"Circle": f"{lat:.5f},{lon:.5f} {radius}"},
+        })
+    items = []
+    for i in range(4):
+        lat0, lon0 = rng.uniform(51.9, 52.3), rng.uniform(4.7, 5.5)
+        ring = []
+        for k in range(60):
+            angle = 2 * math.pi * k / 60
+            r = rng.uniform(0.05, 0.15)
+            ring.append(f"{lat0 + r * math.sin(angle):.6f},{lon0 + r * math.cos(angle):.6f}")
+        items.append({"id": f"nl-{i}", "stop_at": None, "area": [" ".join(ring)]})
+    return AlertModel(
+        compile_burgernet(alerts).alerts(), compile_nl_alert({"data": items}).alerts(), 1
+    )
+
+
+def test_points_within_safe_radius_get_the_same_verdict():
+    rng = random.Random(0)
+    model = _model(rng)
+    max_radius_m = 5000
+    for _ in range(200):
+        lat, lon = rng.uniform(51.8, 52.4), rng.uniform(4.6, 5.6)
+        radius = model.safe_radius(lat, lon, max_radius_m)
+        expected = (model.rank_burgernet(lat, lon, max_radius_m), model.match_nl_alert(lat, lon))
+        for _ in range(5):
+            distance = rng.uniform(0, radius)
+            angle = rng.uniform(0, 2 * math.pi)
+            moved_lat = lat + distance * math.cos(angle) / M_PER_DEG
+            moved_lon = lon + distance * math.sin(angle) / (
+                M_PER_DEG * math.cos(math.radians(lat))
+            )
+            assert haversine(lat, lon, moved_lat, moved_lon) <= radius * 1.001
+            ranked = model.rank_burgernet(moved_lat, moved_lon, max_radius_m)
+            assert model.match_nl_alert(moved_lat, moved_lon) is expected[1]
+            # The set of circles holds; the distance ranking of several may
+            # change, which is why the coordinator reuses only single matches
+            assert {a["AlertId"] for a in ranked} == {a["AlertId"] for a in expected[0]}
+            if len(expected[0]) < 2:
+                assert ranked == expected[0]
@@ -0,0 +1,141 @@
+# custom_components/nl_alert/tests/test_pipeline.py
+
+"""
+SourcePipeline against a scripted session: validators, 304, 429/503 and
+unchanged bodies. Needs Home Assistant's dt util, so it is skipped where
+`homeassistant` is not installed.
+"""
+
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from nl_alert.model import compile_burgernet
+from nl_alert.pipeline import SourcePipeline
+from nl_alert.scheduler import PollScheduler
+
+ALERTS = [{"AlertId": 1, "AlertLevel": 1, "Area": {"Circle": "52.0,5.0 5000"}}]
+
+
+class Response:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise ValueError(f"HTTP {self.status}")
+
+
+class Session:
+    """Answers each GET with the next scripted response, recording headers."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, headers):
+        self.sent.append(dict(headers))
+        return self.responses.pop(0)
+
+
+class Hass:
+    def async_create_task(self, coro, name=None):
+        return asyncio.get_running_loop().create_task(coro)
+
+
+def _ok(alerts, etag):
+    return Response(200, json.dumps(alerts).encode(), {"ETag": etag})
+
+
+def _pipeline():
+    scheduler = PollScheduler(timedelta(minutes=1), timedelta(minutes=8))
+    return SourcePipeline(
+        Hass(), "burgernet", "http://upstream/burgernet", 5, scheduler,
+        compile_burgernet, inline_limit=1 << 20,
+    )
+
+
+def _run(pipeline, session, polls):
+    async def run():
+        return [await pipeline.async_refresh(session) for _ in range(polls)]
+    return asyncio.run(run())
+
+
+def test_rejected_body_does_not_replace_validators():
+    pipeline = _pipeline()
+    session = Session(
+        _ok(ALERTS, '"good"'),
+        Response(200, b"<html>maintenance</html>", {"ETag": '"bad"'}),
+        Response(200, b"<html>maintenance</html>", {"ETag": '"bad"'}),
+    )
+    _run(pipeline, session, 3)
+    # The third poll still revalidates the last good body, not the rejected one
+    assert session.sent[2]["If-None-Match"] == '"good"'
+    assert isinstance(pipeline.last_error, ValueError)
+    assert pipeline.payload == ALERTS
+
+
+def test_not_modified_keeps_the_payload():
+    pipeline = _pipeline()
+    session = Session(_ok(ALERTS, '"v1"'), Response(304, headers={"ETag": '"v1"'}))
+    assert _run(pipeline, session, 2) == [True, False]
+    assert "If-None-Match" not in session.sent[0]
+    assert session.sent[1]["If-None-Match"] == '"v1"'
+    assert pipeline.payload == ALERTS
+    assert pipeline.last_error is None
+    assert pipeline.stats.not_modified == 1
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_rate_limit_backs_off_for_retry_after(status):
+    from homeassistant.util import dt as dt_util
+
+    pipeline = _pipeline()
+    session = Session(Response(status, headers={"Retry-After": "3600"}))
+    assert _run(pipeline, session, 1) == [False]
+    assert pipeline.stats.errors == 1
+    assert pipeline.payload is None
+    assert pipeline.next_due >= dt_util.utcnow() + timedelta(minutes=59)
+
+
+def test_rate_limit_keeps_the_last_good_payload():
+    pipeline = _pipeline()
+    session = Session(_ok(ALERTS, '"v1"'), Response(503))
+    assert _run(pipeline, session, 2) == [True, False]
+    assert pipeline.payload == ALERTS
+    assert pipeline.last_error is not None
+
+
+def test_identical_body_is_not_processed_again():
+    pipeline = _pipeline()
+    session = Session(_ok(ALERTS, '"v1"'), _ok(ALERTS, '"v2"'))
+    assert _run(pipeline, session, 2) == [True, False]
+    assert pipeline.stats.unchanged == 1
+    # Accepted, so its validators are used from now on
+    assert pipeline.as_dict()["validators"] == {"If-None-Match": '"v2"'}
+
+
+def test_new_bytes_with_the_same_alerts_are_unchanged():
+    pipeline = _pipeline()
+    reordered = [dict(reversed(list(ALERTS[0].items())))]
+    session = Session(_ok(ALERTS, '"v1"'), _ok(reordered, '"v2"'))
+    _run(pipeline, session, 1)
+    compiled = pipeline.compiled
+    assert _run(pipeline, session, 1) == [False]
+    assert pipeline.compiled is compiled
+    assert pipeline.stats.unchanged == 1
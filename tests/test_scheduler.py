@@ -0,0 +1,82 @@
+# custom_components/nl_alert/tests/test_scheduler.py
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from nl_alert.scheduler import JITTER, PollScheduler, parse_retry_after
+
+MINUTE = 60
+
+
+def _minutes(interval):
+    return interval.total_seconds() / MINUTE
+
+
+def _assert_about(interval, minutes):
+    assert minutes * (1 - JITTER) <= _minutes(interval) <= minutes * (1 + JITTER)
+
+
+def _scheduler():
+    return PollScheduler(timedelta(minutes=1), timedelta(minutes=8))
+
+
+def test_quiet_polls_double_up_to_the_maximum():
+    scheduler = _scheduler()
+    for minutes in (2, 4, 8, 8, 8):
+        _assert_about(scheduler.on_success(active=False, changed=False), minutes)
+
+
+def test_activity_resets_to_the_minimum():
+    scheduler = _scheduler()
+    for _ in range(3):
+        scheduler.on_success(active=False, changed=False)
+    _assert_about(scheduler.on_success(active=True, changed=False), 1)
+    _assert_about(scheduler.on_success(active=False, changed=False), 2)
+    _assert_about(scheduler.on_success(active=False, changed=True), 1)
+
+
+def test_failures_back_off_and_success_resets():
+    scheduler = _scheduler()
+    for minutes in (1, 2, 4, 8, 8):
+        _assert_about(scheduler.on_failure(), minutes)
+    _assert_about(scheduler.on_success(active=True, changed=False), 1)
+    _assert_about(scheduler.on_failure(), 1)
+
+
+def test_retry_after_is_never_undercut():
+    scheduler = _scheduler()
+    for _ in range(20):
+        interval = scheduler.on_failure(retry_after=30 * MINUTE)
+        assert 30 <= _minutes(interval) <= 30 * (1 + JITTER)
+    # A shorter Retry-After does not cut the backoff short either
+    _assert_about(scheduler.on_failure(retry_after=1), 8)
+
+
+def test_minimum_above_maximum_is_clamped():
+    scheduler = PollScheduler(timedelta(minutes=5), timedelta(minutes=2))
+    assert scheduler.max_interval == timedelta(minutes=5)
+    _assert_about(scheduler.on_success(active=False, changed=False), 5)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, None),
+        ("", None),
+        ("120", 120.0),
+        ("1.5", 1.5),
+        ("-5", 0.0),
+        ("soon", None),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(minutes=10)
+    seconds = parse_retry_after(format_datetime(when, usegmt=True))
+    assert 9 * MINUTE <= seconds <= 10 * MINUTE